@@ -1,21 +1,162 @@
 __version__ = "0.4.7"
 
+import asyncio
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 import configparser
+import contextlib
+import functools
+import hashlib
+import logging
+from multiprocessing import shared_memory
+import operator
+import os
 from pathlib import Path
+import re
 import struct
+import tempfile
+import threading
+import time
+import tracemalloc
+import weakref
 
 import numpy as np
 
 DEBUG = False
 
-def base_data_path(path: Path) -> Path:
+_logger = logging.getLogger(__name__)
+
+# <stem>_XXXX_YYYY.<ext> mosaic tile file name
+_TILE_NAME = re.compile(r'(.*)_(\d{4})_(\d{4})(\.[^.]*)$')
+
+
+class DirectoryIndex(object):
+    """
+    Index of the files in a dataset directory, built with a single os.scandir() pass
+
+    Lookups are case-insensitive (an exact-case match is preferred), so resolving
+    paths and discovering tiles needs no further filesystem round trips. The scan
+    records names only; sizes are stat()ed on first request and cached, so only the
+    files a dataset uses are stat()ed. One index can be shared by all the datasets
+    of a directory (see the readers' index= argument).
+
+    Args:
+        path (str):   Dataset directory
+        names (list): File names of the directory, if already listed (skips the scan)
+
+    Attributes:
+        path (Path):  Dataset directory
+        names (set):  File names in the directory
+    """
+
+    def __init__(self, path, names=None):
+        self.path = Path(path)
+        self.names = set()
+        if names is not None:
+            self.names.update(names)
+        else:
+            with os.scandir(self.path) as it:
+                for entry in it:
+                    try:
+                        # Uses the directory entry type, without a stat() on most systems
+                        if entry.is_file():
+                            self.names.add(entry.name)
+                    except OSError:
+                        # Vanished or unreadable entry
+                        continue
+        self._sorted = sorted(self.names)
+        self._folded = {}
+        for name in self._sorted:
+            self._folded.setdefault(name.casefold(), name)
+        self._sizes = {}
+        self._tiles = {}
+
+    def name(self, name):
+        """
+        Returns the on-disk file name matching :name:, or None
+        """
+        if name in self.names:
+            return name
+        return self._folded.get(name.casefold())
+
+    def find(self, name):
+        """
+        Returns the Path of the file matching :name:, or None
+        """
+        name = self.name(name)
+        return None if name is None else self.path.joinpath(name)
+
+    def size(self, name):
+        """
+        Returns the size in bytes of the file matching :name:, or None
+        """
+        name = self.name(name)
+        if name is None:
+            return None
+        if name not in self._sizes:
+            self._sizes[name] = os.stat(self.path.joinpath(name)).st_size
+        return self._sizes[name]
+
+    def tiles(self, stem, ext):
+        """
+        Returns {(x, y): file name} of the :stem:_XXXX_YYYY:ext: tile files
+        """
+        key = (stem.casefold(), ext.casefold())
+        if key not in self._tiles:
+            tiles = {}
+            for name in self._sorted:
+                m = _TILE_NAME.match(name)
+                if m and (m.group(1).casefold(), m.group(4).casefold()) == key:
+                    tiles.setdefault((int(m.group(2)), int(m.group(3))), name)
+            self._tiles[key] = tiles
+        return self._tiles[key]
+
+    def tile_counts(self, stem, ext):
+        """
+        Returns the mosaic dimensions (xtiles, ytiles) from the first row and column
+        """
+        tiles = self.tiles(stem, ext)
+        xtiles = sum(1 for (x, y) in tiles if y == 0)
+        ytiles = sum(1 for (x, y) in tiles if x == 0)
+        return xtiles, ytiles
+
+    def check_tiles(self, stem, ext, shape, nbytes):
+        """
+        Report tiles of a (xtiles, ytiles) :shape: mosaic that are absent or
+        smaller than :nbytes:, stat()ing only the tile files
+
+        Returns:
+            dict with 'missing' and 'short' lists of (x, y) tile coordinates
+        """
+        tiles = self.tiles(stem, ext)
+        report = {'missing': [], 'short': []}
+        for (x, y) in np.ndindex(*shape):
+            name = tiles.get((x, y))
+            if name is None:
+                report['missing'].append((x, y))
+            elif self.size(name) < nbytes:
+                report['short'].append((x, y))
+        return report
+
+
+def _index_for(path: Path, index=None):
+    """
+    Returns :index: if provided, otherwise a new DirectoryIndex of :path:'s directory
+    """
+    return DirectoryIndex(path.parent) if index is None else index
+
+def base_data_path(path: Path, index=None) -> Path:
     """
     Find the correct base for data files
 
     For example, folder with ["ab9.dmt", "AB9_0000_0000.dmd"] should return "AB9"
+
+    :index: is an optional DirectoryIndex of the parent directory
     """
     if path.suffix == ".dmt":
-        for child in path.parent.iterdir():
+        index = _index_for(path, index)
+        for name in index._sorted:
+            child = path.parent.joinpath(name)
             if child.suffix == ".dmt":
                 continue
             elif child.stem.casefold() == (path.stem + "_0000_0000").casefold():
@@ -23,70 +164,203 @@ def base_data_path(path: Path) -> Path:
     else:
         return path
 
-def bsp_path(path: Path) -> Path:
+def bsp_path(path: Path, index=None) -> Path:
     """
     Find the correct Path for the bsp file
 
     Necessary as bsp can be equal to .dat/.seq, or lowercase
     """
     bsp = path.with_suffix(".bsp")
-    if bsp.is_file():
-        return bsp
+    found = _index_for(path, index).find(bsp.name)
+    if found is not None:
+        return found
     else:
         return path.parent.joinpath(bsp.name.lower())
 
-def check_files(filename, exts):
+def check_files(filename, exts, index=None):
     """
     takes filename string and list of extensions, checks that they all exist and
     returns a Path
+
+    :index: is an optional DirectoryIndex of the file's directory, otherwise one
+    is built for the checks.
     """
     p = Path(filename)
-    p = base_data_path(p)
+    index = _index_for(p, index)
+    p = base_data_path(p, index)
     for ext in exts:
         if ext == ".dmt":
-            ps = dmt_path(p)
+            ps = dmt_path(p, index)
         elif ext in [".drd", ".dmd"]:
             # Always has at least _0000_0000 tile
             ps = p.parent.joinpath(p.stem + "_0000_0000" + ext)
         elif ext == ".bsp":
-            ps = bsp_path(p)
+            ps = bsp_path(p, index)
         else:
             ps = p.with_suffix(ext)
-        if not ps.is_file():
+        if index.find(ps.name) is None:
             raise FileNotFoundError('File "{}" was not found.'.format(ps))
     return p
 
-def dmt_path(path: Path) -> Path:
+def dmt_path(path: Path, index=None) -> Path:
     """
     Returns a Path object for the dmt file for the provided path.
 
     Defaults to `.lower()` but checks if it exists and falls back to case matching.
     """
-    dmt_file = path.parent.joinpath(path.with_suffix(".dmt").name.lower())
-    if not dmt_file.is_file():
-        dmt_file = path.parent.joinpath(path.with_suffix(".dmt").name)
-        if not dmt_file.is_file():
-            raise FileNotFoundError('File "{}" was not found.'.format(dmt_file))
+    index = _index_for(path, index)
+    dmt_file = index.find(path.with_suffix(".dmt").name.lower())
+    if dmt_file is None:
+        raise FileNotFoundError('File "{}" was not found.'.format(
+            path.parent.joinpath(path.with_suffix(".dmt").name)))
     return dmt_file
 
-def _readint(f):
-    return struct.unpack("<i", f.read(4))[0]
+# Control characters stripped from header values
+_STRP = b'\x00\x01\x02\x03\x04\x05\x06\x07\x08\x09\x10\x11\x12\x13\x14\x15\x16\x17\x18\x19'
+
+# \x00 separated header field containing at least one non-STRP character
+# (group 1 has leading STRP characters removed)
+_SECTION_FIELD = re.compile(b'[\x00-\x09\x10-\x19]*([^\x00-\x09\x10-\x19][^\x00]*)')
+
+
+class agilentHeader(object):
+    """
+    Indexed view of the properties in a .bsp/.dmt header.
+
+    The header is read once into a shared buffer. The offsets of each property name
+    are located on first lookup and cached, and values are decoded on demand at the
+    indexed offset, so repeated lookups never rescan the buffer.
+
+    Args:
+        dat (bytes):   Contents of the .bsp/.dmt file
 
-def _readdouble(f):
-    return struct.unpack("<d", f.read(8))[0]
+    Attributes:
+        dat (bytes):   Header buffer
+    """
+
+    def __init__(self, dat):
+        self.dat = dat
+        self._offsets = {}
+
+    @classmethod
+    def from_path(cls, p):
+        with p.open(mode='rb') as f:
+            return cls(f.read())
+
+    def _occurrences(self, b_name):
+        try:
+            return self._offsets[b_name]
+        except KeyError:
+            offsets = []
+            i = self.dat.find(b_name)
+            while i >= 0:
+                offsets.append(i)
+                i = self.dat.find(b_name, i + 1)
+            self._offsets[b_name] = offsets
+            return offsets
+
+    def find(self, name, prefix=b'', suffix=b''):
+        """
+        Returns the offset just past the first :name: surrounded by :prefix: and :suffix:,
+        or -1 if not found
+        """
+        b_name = bytes(name, encoding='utf8')
+        for start in self._occurrences(b_name):
+            end = start + len(b_name)
+            if self.dat.startswith(suffix, end) and \
+                    self.dat.endswith(prefix, 0, start):
+                return end
+        return -1
+
+    def __contains__(self, name):
+        return self.find(name) >= 0
+
+    def _find_data(self, name):
+        offset = self.find(name)
+        if offset < 0:
+            raise KeyError("Property not found: {}".format(name))
+        # PropType value block follows the "1.00" version string
+        return self.dat.find(b"1.00", offset) + 4
+
+    def get_double(self, name):
+        """
+        Returns the value of PropType property :name: as a float
+        """
+        return struct.unpack_from("<d", self.dat, self._find_data(name) + 12)[0]
+
+    def get_proptype_data(self, name):
+        """
+        Returns (PtSep, StartPt, Npts) for PropType data property :name:
+        """
+        i = self._find_data(name)
+        PtSep = struct.unpack_from("<d", self.dat, i + 12)[0]
+        StartPt = struct.unpack_from("<i", self.dat, i + 24)[0]
+        Npts = struct.unpack_from("<i", self.dat, i + 32)[0]
+        return PtSep, StartPt, Npts
+
+    def get_str(self, name):
+        """
+        Returns the value of string property :name:, or '' if not found
+        """
+        offset = self.find(name, b'\x00', b'\x04')
+        if offset < 0:
+            return ''
+        val = self.dat[offset + 1:offset + 101].lstrip(_STRP + b'\n').split(b'\x00')[0].strip(_STRP)
+        return val.decode('utf8', errors='replace')
+
+    def get_section(self, section):
+        """
+        Returns the key, value pairs of :section: as a dict
+        """
+        offset = self.find(section)
+        dat = self.dat[offset:].lstrip(_STRP) if offset >= 0 else b''
+        try:
+            n = dat[0]
+        except IndexError:
+            raise IndexError("Section not found")
+
+        # Walk the fields lazily, only as far as the end of the section. Fields made up
+        # entirely of STRP characters are always skipped, so are not matched at all.
+        fields = (m.group(1).rstrip(_STRP) for m in _SECTION_FIELD.finditer(dat, 1))
+        skip = {b'', b'\n', b'\"', b'\t', b',', b'\r', b'#', b'!', b'%',
+                b'\x0b', b'\x0c', b'\x0e', b'\x0f', b'\x1a', b'\x1c', b'\x1e', b'\x1f'}
+
+        def next_field():
+            for field in fields:
+                if field not in skip:
+                    return field
+            raise IndexError("Unexpected end of section")
+
+        d = {}
+        for n in range(n):
+            k = next_field().decode('utf8', errors='replace')
+            v = next_field()
+            if v in [b'Data', b'PropType']:
+                # Give up, maybe end of section
+                return d
+            d[k] = v.decode('utf8', errors='replace')
+        return d
+
+
+def _header(f):
+    """
+    Returns an agilentHeader for an open file handle, or :f: if already an agilentHeader
+    """
+    if isinstance(f, agilentHeader):
+        return f
+    f.seek(0)
+    return agilentHeader(f.read())
 
 def _get_wavenumbers(f):
     """
-    takes an open file handle, grabs the startwavenumber, numberofpoints and step,
-    calculates wavenumbers array and returns all in dict
+    takes an open file handle (or agilentHeader), grabs the startwavenumber,
+    numberofpoints and step, calculates wavenumbers array and returns all in dict
     """
+    dat = _header(f).dat
     d = {}
-    f.seek(2228)
-    d['StartPt'] = _readint(f)
-    f.seek(2236)
-    d['Npts'] = _readint(f)
-    f.seek(2216)
-    d['PtSep'] = _readdouble(f)
+    d['StartPt'] = struct.unpack_from("<i", dat, 2228)[0]
+    d['Npts'] = struct.unpack_from("<i", dat, 2236)[0]
+    d['PtSep'] = struct.unpack_from("<d", dat, 2216)[0]
     d['wavenumbers'] = [d['PtSep'] * (d['StartPt'] + i) for i in range(d['Npts'])]
 
     if DEBUG:
@@ -99,58 +373,15 @@ def _get_wavenumbers(f):
 
 def _get_params(f):
     """
-    Takes an open file handle and reads a preset selection of parameters
+    Takes an open file handle (or agilentHeader) and reads a preset selection of parameters
     returns in a dictionary
     """
-    STRP = b'\x00\x01\x02\x03\x04\x05\x06\x07\x08\x09\x10\x11\x12\x13\x14\x15\x16\x17\x18\x19'
-
-    def _get_section(dat, section):
-        skip = [b'', b'\n', b'\"', b'\t', b',', b'\r', b'#', b'!', b'%',
-                b'\x0b', b'\x0c', b'\x0e', b'\x0f', b'\x1a', b'\x1c', b'\x1e', b'\x1f']
-        d = {}
-        part = dat.partition(bytes(section, encoding='utf8'))
-        dat = part[2].lstrip(STRP)
-        try:
-            n = dat[0]
-        except IndexError:
-            raise IndexError("Section not found")
-        dat = dat[1:].split(b'\x00')
-        i = 0
-        for n in range(n):
-            while dat[i].strip(STRP) in skip:
-                i += 1
-            k = dat[i].strip(STRP).decode('utf8', errors='replace')
-            i += 1
-            while dat[i].strip(STRP) in skip:
-                i += 1
-            if dat[i].strip(STRP) in [b'Data', b'PropType']:
-                # Give up, maybe end of section
-                return d
-            else:
-                v = dat[i].strip(STRP).decode('utf8', errors='replace')
-                i += 1
-            d[k] = v
-        return d
-
-    def _get_prop_d(dat, param):
-        part = dat.partition(bytes(param, encoding='utf8'))
-        val_b = part[2].partition(bytes("1.00", encoding='utf8'))[2]
-        val = struct.unpack("<d", val_b[12:20])[0]
-        return val
-
-    def _get_prop_str(dat, param):
-        b_param = b'\x00' + bytes(param, encoding='utf8') + b'\x04'
-        part = dat.partition(b_param)
-        val = part[2][:100].lstrip(STRP + b'\n').split(b'\x00')[0].strip(STRP)
-        return val.decode('utf8', errors='replace')
-
+    h = _header(f)
     d = {}
-    f.seek(0)
-    dat = f.read()
 
-    d['Visible Pixel Size'] = _get_prop_d(dat, 'Visible Pixel Size')
-    d['FPA Pixel Size'] = _get_prop_d(dat, 'FPA Pixel Size')
-    d['Rapid Stingray'] = _get_section(dat, 'Rapid Stingray')
+    d['Visible Pixel Size'] = h.get_double('Visible Pixel Size')
+    d['FPA Pixel Size'] = h.get_double('FPA Pixel Size')
+    d['Rapid Stingray'] = h.get_section('Rapid Stingray')
     d['Time Stamp'] = d['Rapid Stingray']['Time Stamp']
 
     k_int = ['PixelAggregationSize',
@@ -159,7 +390,7 @@ def _get_params(f):
     ]
     for k in k_int:
         try:
-            d[k] = int(_get_prop_str(dat, k))
+            d[k] = int(h.get_str(k))
         except ValueError:
             pass
 
@@ -167,35 +398,26 @@ def _get_params(f):
     ]
     for k in k_float:
         try:
-            d[k] = float(_get_prop_str(dat, k))
+            d[k] = float(h.get_str(k))
         except ValueError as e:
             pass
 
     k_str = ['Symmetry',
     ]
     for k in k_str:
-        d[k] = _get_prop_str(dat, k)
+        d[k] = h.get_str(k)
 
     return d
 
 def _get_ifg_params(f):
     """
-    Takes an open file handle and reads a preset selection of parameters
+    Takes an open file handle (or agilentHeader) and reads a preset selection of parameters
     returns in a dictionary
     """
-    def _get_proptype_data(dat, param):
-        part = dat.partition(bytes(param, encoding='utf8'))
-        val_b = part[2].partition(bytes("1.00", encoding='utf8'))[2]
-        PtSep = struct.unpack("<d", val_b[12:20])[0]
-        StartPt = struct.unpack("<i", val_b[24:28])[0]
-        Npts = struct.unpack("<i", val_b[32:36])[0]
-        return PtSep, StartPt, Npts
-
+    h = _header(f)
     d = {}
-    f.seek(0)
-    dat = f.read()
 
-    d['PtSep'], d['StartPt'], d['Npts'] = _get_proptype_data(dat, 'Interferogram')
+    d['PtSep'], d['StartPt'], d['Npts'] = h.get_proptype_data('Interferogram')
 
     if DEBUG:
         for k,v in d.items():
@@ -220,20 +442,292 @@ def _fpa_size(datasize, Npts):
         raise ValueError(f"Unexpected FPA size: {fpa_sq}, ({fpasize}, {fpasize}, {Npts})")
     return fpasize
 
-def _reshape_tile(data, shape):
+def _band_runs(bands):
+    """
+    Split sorted band indices into (start, stop) runs of consecutive planes
+    """
+    splits = np.nonzero(np.diff(bands) != 1)[0] + 1
+    return [(int(run[0]), int(run[-1]) + 1) for run in np.split(bands, splits)]
+
+def _load_tile(path, shape, mmap=False, buf=None, bands=None, layout="bip"):
+    """
+    Load FPA tile data from :path: and return it as a [ rows, columns, wavelengths ] array
+    (or [ wavelengths, rows, columns ] for :layout: "bsq", which needs no transpose)
+
+    Data is band-sequential on disk, so when :bands: is given only those planes are read.
+
+    Args:
+        path (Path):          .dat, .seq, .dmd or .drd file
+        shape (tuple):        On-disk tile shape (Npts, fpasize, fpasize)
+        mmap (bool):          Return a copy-on-write np.memmap view instead of reading the file
+        buf (:obj:`ndarray`): Reusable float32 read buffer of the output shape (allocated if None)
+        bands (:obj:`ndarray`): Sorted band indices to load (default: all)
+        layout (str):         "bip" or "bsq" output layout
+    """
+    runs = [(0, shape[0])] if bands is None else _band_runs(bands)
+    n_bands = sum(stop - start for start, stop in runs)
+    if mmap:
+        # Skip the 255 block preamble (1020 bytes)
+        data = np.memmap(path, dtype='<f', mode='c', offset=255*4, shape=shape)
+        if len(runs) == 1:
+            data = data[runs[0][0]:runs[0][1]]
+        else:
+            data = data[bands]
+    else:
+        if buf is None:
+            buf = np.empty((n_bands,) + shape[1:], dtype='<f')
+        data = buf
+        plane = shape[1] * shape[2] * 4
+        with path.open(mode='rb') as f:
+            if os.fstat(f.fileno()).st_size != 255*4 + shape[0] * plane:
+                raise ValueError("Unexpected tile size in {}, expected shape {}".format(path, shape))
+            i = 0
+            for start, stop in runs:
+                # Skip the 255 block preamble (1020 bytes) and unselected planes
+                f.seek(255*4 + start * plane)
+                f.readinto(data[i:i + stop - start])
+                i += stop - start
+    return _to_layout(data, layout)
+
+def _check_layout(layout):
+    if layout not in ("bip", "bsq"):
+        raise ValueError("Unknown layout: {}".format(layout))
+    return layout
+
+def _to_layout(data, layout):
     """
-    Reshape and transpose FPA tile data
+    Returns on-disk [ wavelengths, rows, columns ] :data: as a view in :layout:
     """
-    # Reshape ndarray
-    data = data[255:]
-    # Using shape attribute to raise error if a copy is made of the array
-    data.shape = shape
+    if layout == "bsq":
+        return data
     # Transpose to standard [ rows, columns, wavelengths ]
-    data = np.transpose(data, (1,2,0))
-    return data
+    return np.transpose(data, (1,2,0))
+
+def _image_shape(height, width, Npts, layout):
+    """
+    Returns the data array shape for :layout:
+    """
+    return (Npts, height, width) if layout == "bsq" else (height, width, Npts)
+
+def _flip_rows(data, layout):
+    """
+    Rotate and flip tile to match matplotlib/MATLAB image coordinates
+    """
+    return np.flip(data, axis=0 if layout == "bip" else 1)
+
+# Block size for tile copies, chosen so source and destination blocks stay in cache
+_BLOCK_ROWS = 16
+_BLOCK_PTS = 32
+
+def _copy_tile(dest, tile, layout="bip"):
+    """
+    Copy :tile: into :dest:, casting to dest.dtype
+
+    A [ rows, columns, wavelengths ] (transposed) tile is copied in (rows x wavelengths)
+    blocks, which is several times faster than a single strided assignment.
+    A "bsq" tile matches the on-disk order, so is copied as contiguous planes.
+    """
+    if layout == "bsq":
+        dest[...] = tile
+        return
+    rows, _, npts = tile.shape
+    for r in range(0, rows, _BLOCK_ROWS):
+        for w in range(0, npts, _BLOCK_PTS):
+            dest[r:r+_BLOCK_ROWS, :, w:w+_BLOCK_PTS] = tile[r:r+_BLOCK_ROWS, :, w:w+_BLOCK_PTS]
+
+def _tile_slices(x, y, ytiles, fpasize, MAT):
+    """
+    Returns the (rows, columns) slices of the mosaic array covered by tile (x, y)
+    """
+    if MAT:
+        row = y
+    else:
+        # Tile data is in normal cartesian coordinates
+        # but tile numbering (000x_000y)
+        # is left-to-right, top-to-bottom (image coordinates)
+        row = ytiles - y - 1
+    return (slice(row*fpasize, (row+1)*fpasize),
+            slice(x*fpasize, (x+1)*fpasize))
+
+def _roi_overlap(rows, cols, roi):
+    """
+    Returns the (rows, columns) slices of the :roi: region and of the tile covering
+    mosaic :rows:, :cols: where they overlap, or None if they do not
+    """
+    roi_rows, roi_cols = roi
+    r0, r1 = max(rows.start, roi_rows.start), min(rows.stop, roi_rows.stop)
+    c0, c1 = max(cols.start, roi_cols.start), min(cols.stop, roi_cols.stop)
+    if r0 >= r1 or c0 >= c1:
+        return None
+    return ((slice(r0 - roi_rows.start, r1 - roi_rows.start),
+             slice(c0 - roi_cols.start, c1 - roi_cols.start)),
+            (slice(r0 - rows.start, r1 - rows.start),
+             slice(c0 - cols.start, c1 - cols.start)))
+
+def _roi_coords(tiles_shape, fpasize, MAT, roi):
+    """
+    Returns the (x, y) coordinates of the tiles overlapping :roi:, in file name order
+    """
+    return [(x, y) for (x, y) in np.ndindex(tiles_shape)
+            if _roi_overlap(*_tile_slices(x, y, tiles_shape[1], fpasize, MAT), roi)]
+
+
+def _resolve_bands(wavenumbers, wavenumber_range=None, bands=None):
+    """
+    Returns sorted indices of the bands selected by :wavenumber_range: (lo, hi)
+    or by a list of band indices, or None if all bands are selected.
+    """
+    if wavenumber_range is not None and bands is not None:
+        raise ValueError("Specify only one of wavenumber_range and bands")
+    n = len(wavenumbers)
+    if wavenumber_range is not None:
+        lo, hi = sorted(wavenumber_range)
+        wn = np.asarray(wavenumbers)
+        selected = np.nonzero((wn >= lo) & (wn <= hi))[0]
+    elif bands is not None:
+        selected = np.unique(np.asarray(bands, dtype=int))
+        if selected.size and not (-n <= selected[0] and selected[-1] < n):
+            raise IndexError("Band index out of range for {} bands".format(n))
+        selected = np.unique(selected % n)
+    else:
+        return None
+    if selected.size == 0:
+        raise ValueError("No bands selected")
+    return selected
+
+def _select_bands(info, bands):
+    """
+    Trim the wavenumber information in :info: to the selected :bands:
+    """
+    if bands is None:
+        return
+    info['bands'] = bands.tolist()
+    info['wavenumbers'] = [info['wavenumbers'][i] for i in bands]
+    info['StartPt'] = info['StartPt'] + int(bands[0])
+    info['Npts'] = len(bands)
+
+def _spectral_bin_factor(info, spectral_bin=1, resolution=None):
+    """
+    Returns the number of adjacent bands averaged for :spectral_bin: or a target
+    :resolution: (cm-1), a whole multiple of the acquired info['Resolution']
+    (of the point separation info['PtSep'] if the header has no resolution)
+    """
+    if resolution is not None:
+        if spectral_bin != 1:
+            raise ValueError("Specify only one of spectral_bin and resolution")
+        step = info.get('Resolution') or info['PtSep']
+        spectral_bin = int(round(resolution / step))
+        if spectral_bin < 1 or not np.isclose(resolution, spectral_bin * step):
+            raise ValueError("resolution must be a whole multiple of the acquired "
+                             "resolution ({} cm-1)".format(step))
+    if spectral_bin < 1:
+        raise ValueError("spectral_bin must be at least 1")
+    return spectral_bin
+
+def _spectral_bin_bands(bands, Npts, spectral_bin):
+    """
+    Returns the band indices to read for :spectral_bin: averaging (whole groups only)
+    """
+    if spectral_bin == 1:
+        return bands
+    if bands is None:
+        bands = np.arange(Npts)
+    elif np.any(np.diff(bands) != 1):
+        raise ValueError("Spectral binning needs a contiguous band selection")
+    n = len(bands) // spectral_bin * spectral_bin
+    if n == 0:
+        raise ValueError("Fewer bands than the spectral binning factor")
+    return bands[:n]
+
+def _set_spectral_bin(info, spectral_bin):
+    """
+    Recompute the wavenumber and resolution information in :info: for :spectral_bin:
+    averaged bands
 
+    StartPt becomes the (generally fractional) centre of the first group, in units
+    of the new PtSep, so that wavenumbers = PtSep * (StartPt + i) still holds.
+    """
+    if spectral_bin == 1:
+        return
+    info['spectral_bin'] = spectral_bin
+    if info.get('Resolution'):
+        info['Resolution'] = info['Resolution'] * spectral_bin
+    info['PtSep'] = info['PtSep'] * spectral_bin
+    info['StartPt'] = (info['StartPt'] + (spectral_bin - 1) / 2) / spectral_bin
+    info['Npts'] = info['Npts'] // spectral_bin
+    info['wavenumbers'] = [info['PtSep'] * (info['StartPt'] + i) for i in range(info['Npts'])]
+
+def _bin_bands(tile, spectral_bin, layout="bip"):
+    """
+    Returns :tile: with each group of :spectral_bin: adjacent bands averaged
+    """
+    # Average whole band planes
+    planes = np.moveaxis(tile, -1, 0) if layout == "bip" else tile
+    k, r, c = planes.shape
+    binned = planes.reshape(k // spectral_bin, spectral_bin, r, c).mean(axis=1)
+    return _to_layout(binned, layout)
 
-def get_visible_images(p):
+def _pixel_size(info):
+    """
+    Returns the size of a (possibly aggregated and binned) FPA pixel in microns
+    """
+    return info['FPA Pixel Size'] * info.get('PixelAggregationSize', 1) * info.get('bin', 1)
+
+def _set_bin(info, bin):
+    """
+    Reduce info['fpasize'] for :bin: x :bin: binned tiles, and record the effective pixel size
+    """
+    if bin < 1 or info['fpasize'] % bin:
+        raise ValueError("bin must divide the FPA size {}".format(info['fpasize']))
+    info['fpasize'] //= bin
+    info['bin'] = bin
+    info['Effective Pixel Size'] = _pixel_size(info)
+
+def _bin_tile(tile, bin, layout="bip"):
+    """
+    Returns :tile: block-averaged over :bin: x :bin: pixels
+    """
+    if layout == "bsq":
+        n, r, c = tile.shape
+        return tile.reshape(n, r // bin, bin, c // bin, bin).mean(axis=(2, 4))
+    r, c, n = tile.shape
+    return tile.reshape(r // bin, bin, c // bin, bin, n).mean(axis=(1, 3))
+
+def _resolve_roi(roi, units, shape, info, MAT):
+    """
+    Returns (rows, columns) slices of a mosaic of :shape: (height, width) covered by :roi:
+
+    :roi: is a (rows, columns) pair of (start, stop) ranges, slices or None (full axis).
+    With :units: 'um' the pair is instead (y, x) in microns, in the coordinate frame of
+    get_visible_images(): origin at the bottom-left corner of the IR mosaic, y upwards.
+    """
+    if units not in ("px", "um"):
+        raise ValueError("Unknown ROI units: {}".format(units))
+    ranges = []
+    for r, n in zip(roi, shape):
+        if r is None:
+            r = slice(None)
+        elif not isinstance(r, slice):
+            r = slice(*r)
+        if units == "um":
+            px = _pixel_size(info)
+            lo = 0 if r.start is None else int(np.floor(r.start / px))
+            hi = n if r.stop is None else int(np.ceil(r.stop / px))
+            r = slice(min(max(lo, 0), n), min(max(hi, 0), n))
+        start, stop, step = r.indices(n)
+        if step != 1:
+            raise ValueError("ROI ranges must be contiguous")
+        ranges.append(slice(start, max(start, stop)))
+    rows, cols = ranges
+    if units == "um" and MAT:
+        # Micron y axis runs upwards, MAT image rows run downwards
+        rows = slice(shape[0] - rows.stop, shape[0] - rows.start)
+    if rows.start == rows.stop or cols.start == cols.stop:
+        raise ValueError("ROI does not overlap the mosaic")
+    return rows, cols
+
+
+def get_visible_images(p, index=None):
     """
     Takes a Path to the datafile and returns a list of visible images.
 
@@ -246,15 +740,20 @@ def get_visible_images(p):
       'pos_y'           Bottom-left corner, y (microns)
       'img_size_x'      Width of image (microns)
       'img_size_y'      Height of image (microns)
+
+    :index: is an optional DirectoryIndex of the data directory
     """
     visible_images = []
+    index = _index_for(p, index)
 
     config = configparser.ConfigParser()
-    config.read(p.parent.joinpath("IrMosaicInfo.cfg"))
-    config.read(p.parent.joinpath("VisMosaicInfo.cfg"))
+    for cfg in ("IrMosaicInfo.cfg", "VisMosaicInfo.cfg"):
+        cfg_path = index.find(cfg)
+        if cfg_path is not None:
+            config.read(cfg_path)
 
-    cutout_path = p.parent.joinpath("IrCutout.bmp")
-    if cutout_path.is_file() and config.has_section('MicronMeasurements'):
+    cutout_path = index.find("IrCutout.bmp")
+    if cutout_path is not None and config.has_section('MicronMeasurements'):
         d = {'name': "IR Cutout",
              'image_ref': cutout_path,
              'pos_x': 0,
@@ -264,8 +763,8 @@ def get_visible_images(p):
              }
         visible_images.append(d)
 
-    full_img_path = p.parent.joinpath("VisMosaicCollectImages_Thumbnail.bmp")
-    if full_img_path.is_file() and config.has_section('MicronMeasurements') \
+    full_img_path = index.find("VisMosaicCollectImages_Thumbnail.bmp")
+    if full_img_path is not None and config.has_section('MicronMeasurements') \
             and config.has_section('VisMosaicDefinition'):
         d = {'name': "Entire Image",
              'image_ref': full_img_path,
@@ -281,6 +780,155 @@ def get_visible_images(p):
     return visible_images
 
 
+# tracemalloc is process-wide: memory-traced phases (of any reader, in any thread)
+# count themselves in here, and tracing started by a phase stops with the last one
+_TRACE_LOCK = threading.Lock()
+_TRACE_PHASES = 0
+_TRACE_OWNED = False
+
+
+class LoadStats(object):
+    """
+    Timing and memory record of opening and loading a dataset
+
+    Collected by the readers when passed stats=True (or a hook function, which is
+    called with the record), and available as their .stats attribute. Phases are
+    timed with perf_counter only; stats="memory" also traces their peak allocation
+    with tracemalloc, which slows opening and loading down. The record is
+    emitted through logging (INFO, with the as_dict() record as the 'stats' extra)
+    after opening and after each load().
+
+    Attributes:
+        reader (str):       Reader class name
+        filename (str):     File name passed to the reader
+        phases (dict):      Seconds spent in each phase: 'scan' (directory listing),
+                            'resolve' (check_files / base_data_path), 'header' (header
+                            reading and parsing), 'setup' (tile loaders), 'vis' (visible
+                            image configuration) and 'load' (reading and assembly)
+        tiles (list):       (file name, seconds, bytes) of each tile read
+        read_time (float):  Seconds reading tiles, summed over threads
+        read_bytes (int):   Bytes of tile data read (from file, mmap or cache)
+        copy_time (float):  Seconds copying tiles into the assembled array,
+                            summed over threads
+        peak_bytes (int):   Peak bytes allocated during a phase (tracemalloc), or None
+                            unless :memory: is set
+        memory (bool):      Trace peak allocations
+
+    tracemalloc keeps a single peak per process, which each memory-traced phase
+    resets on entry (including a peak tracked by the caller). Phases that overlap
+    (concurrent readers, in threads) therefore share one peak: each reports the peak
+    since the latest of them started.
+    """
+
+    def __init__(self, reader, filename, hook=None, memory=False):
+        self.reader = reader
+        self.filename = os.fspath(filename)
+        self.hook = hook
+        self.memory = memory
+        self.phases = {}
+        self.tiles = []
+        self.read_time = 0.
+        self.read_bytes = 0
+        self.copy_time = 0.
+        self.peak_bytes = 0 if memory else None
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """
+        Context manager adding the time (and with .memory, the peak allocation) of
+        its block to phase :name:
+        """
+        if not self.memory:
+            start = time.perf_counter()
+            try:
+                yield
+            finally:
+                elapsed = time.perf_counter() - start
+                with self._lock:
+                    self.phases[name] = self.phases.get(name, 0.) + elapsed
+            return
+        global _TRACE_PHASES, _TRACE_OWNED
+        with _TRACE_LOCK:
+            if _TRACE_PHASES == 0 and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                _TRACE_OWNED = True
+            _TRACE_PHASES += 1
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with _TRACE_LOCK:
+                peak = max(0, tracemalloc.get_traced_memory()[1] - base)
+                _TRACE_PHASES -= 1
+                if _TRACE_PHASES == 0 and _TRACE_OWNED:
+                    tracemalloc.stop()
+                    _TRACE_OWNED = False
+            with self._lock:
+                self.phases[name] = self.phases.get(name, 0.) + elapsed
+                self.peak_bytes = max(self.peak_bytes, peak)
+
+    def add_read(self, path, seconds, nbytes):
+        with self._lock:
+            self.tiles.append((Path(path).name, seconds, nbytes))
+            self.read_time += seconds
+            self.read_bytes += nbytes
+
+    def add_copy(self, seconds):
+        with self._lock:
+            self.copy_time += seconds
+
+    def as_dict(self):
+        """
+        Returns the record as a dict of plain values (e.g. for JSON)
+        """
+        with self._lock:
+            return {'reader': self.reader, 'filename': self.filename,
+                    'phases': dict(self.phases), 'tiles_read': len(self.tiles),
+                    'read_time': self.read_time, 'read_bytes': self.read_bytes,
+                    'copy_time': self.copy_time, 'peak_bytes': self.peak_bytes,
+                    'tiles': list(self.tiles)}
+
+    def emit(self, event):
+        """
+        Log the record for :event: ("open" or "load") and pass it to the hook, if any
+        """
+        if _logger.isEnabledFor(logging.INFO):
+            phases = ", ".join("{} {:.4f}s".format(k, v) for k, v in self.phases.items())
+            peak = "" if self.peak_bytes is None else \
+                   ", peak {} bytes".format(self.peak_bytes)
+            _logger.info("%s %s %s: %s; %d tiles, %d bytes read in %.4fs, copy %.4fs%s",
+                         self.reader, event, self.filename, phases, len(self.tiles),
+                         self.read_bytes, self.read_time, self.copy_time, peak,
+                         extra={'stats': self.as_dict()})
+        if self.hook is not None:
+            self.hook(self)
+
+
+def _load_stats(obj, filename, stats):
+    """
+    Returns the LoadStats for reader :obj: if :stats: is True, "memory" or a hook
+    function, else None
+    """
+    if not stats:
+        return None
+    return LoadStats(type(obj).__name__, filename, stats if callable(stats) else None,
+                     memory=stats == "memory")
+
+def _phase(stats, name):
+    """
+    Returns stats.phase(:name:), or a no-op context if :stats: is None
+    """
+    return contextlib.nullcontext() if stats is None else stats.phase(name)
+
+def _emit(stats, event):
+    if stats is not None:
+        stats.emit(event)
+
+
 class DataObject(object):
     """
     Simple container of a data array and information about that array.
@@ -305,76 +953,899 @@ class agilentImage(DataObject):
     Args:
         filename (str): full path to .dat file
         MAT (bool):     Output array using image coordinates (matplotlib/MATLAB)
+        mmap (bool):    Memory-map the .dat file instead of reading it
+        wavenumber_range (tuple): Only load wavenumbers within (lo, hi)
+        bands (list):   Only load these band indices (sorted)
+        layout (str):   "bip" (height x width x wavenumbers) or
+                        "bsq" (wavenumbers x height x width, as stored on disk)
+        load_data (bool): Read the pixel data now, otherwise only on .load()
+        bin (int):      Block-average bin x bin pixels while loading
+        spectral_bin (int): Average groups of this many adjacent bands while loading
+        resolution (float): Target spectral resolution (cm-1) instead of spectral_bin,
+                            a whole multiple of the acquired Resolution. With either,
+                            info['Resolution'] and 'PtSep' are scaled and 'StartPt'
+                            is the (fractional) centre of the first group
+        stats:          True, or a hook function called with the LoadStats record, to
+                        collect per-phase timing in .stats ("memory": and peak memory)
+        index (DirectoryIndex): Existing index of the file's directory to reuse
 
     Attributes:
         info (dict):            Dictionary of acquisition information
         data (:obj:`ndarray`):  3-dimensional array (height x width x wavenumbers)
+        shape (tuple):          Shape of .data, available before loading
+        stats (LoadStats):      Timing and memory record, if requested (else None)
         wavenumbers (list):     Wavenumbers in order of .data array
         width (int):            Width of image in pixels (rows)
         height (int):           Width of image in pixels (columns)
         filename (str):         Full path to .bsp file
         acqdate (str):          Date and time of acquisition
+        header (agilentHeader): Indexed .bsp header properties
 
     Based on agilent-file-formats MATLAB code by Alex Henderson:
     https://bitbucket.org/AlexHenderson/agilent-file-formats
     """
 
-    def __init__(self, filename, MAT=False):
+    def __init__(self, filename, MAT=False, mmap=False, wavenumber_range=None, bands=None,
+                 layout="bip", load_data=True, bin=1, spectral_bin=1, resolution=None,
+                 stats=None, index=None):
         super().__init__()
-        p = check_files(filename, [".dat", ".bsp"])
+        self.bin = bin
+        self.stats = _load_stats(self, filename, stats)
+        with _phase(self.stats, 'scan'):
+            self.index = _index_for(Path(filename), index)
+        with _phase(self.stats, 'resolve'):
+            p = check_files(filename, [".dat", ".bsp"], self.index)
         self.MAT = MAT
-        self._get_bsp_info(p)
-        self._get_dat(p)
+        self.mmap = mmap
+        self.layout = _check_layout(layout)
+        with _phase(self.stats, 'header'):
+            self._get_bsp_info(p)
+        self.bands = _resolve_bands(self.info['wavenumbers'], wavenumber_range, bands)
+        self.spectral_bin = _spectral_bin_factor(self.info, spectral_bin, resolution)
+        self.bands = _spectral_bin_bands(self.bands, self.info['Npts'], self.spectral_bin)
+        with _phase(self.stats, 'setup'):
+            self._get_dat(p)
+        _select_bands(self.info, self.bands)
+        _set_spectral_bin(self.info, self.spectral_bin)
 
         self.wavenumbers = self.info['wavenumbers']
-        self.width = self.data.shape[0]
-        self.height = self.data.shape[1]
-        self.filename = bsp_path(p).as_posix()
+        self.width = self.info['fpasize']
+        self.height = self.info['fpasize']
+        self.shape = _image_shape(self.height, self.width, self.info['Npts'], self.layout)
+        self.filename = bsp_path(p, self.index).as_posix()
         self.acqdate = self.info['Time Stamp']
+        _emit(self.stats, "open")
+        if load_data:
+            self.load()
 
     def _get_bsp_info(self, p_in):
-        p = bsp_path(p_in)
-        with p.open(mode='rb') as f:
-            self.info.update(_get_wavenumbers(f))
-            self.info.update(_get_params(f))
+        self.header = agilentHeader.from_path(bsp_path(p_in, self.index))
+        self.info.update(_get_wavenumbers(self.header))
+        self.info.update(_get_params(self.header))
 
     def _get_dat(self, p_in):
-        p = p_in.with_suffix(".dat")
-        with p.open(mode='rb') as f:
-            data = np.fromfile(f, dtype='<f')
-        fpasize = _fpa_size(data.size, self.info['Npts'])
-        data = _reshape_tile(data, (self.info['Npts'], fpasize, fpasize))
+        p = self.index.find(p_in.with_suffix(".dat").name)
+        fpasize = _fpa_size(self.index.size(p.name) / 4, self.info['Npts'])
+        self.info['fpasize'] = fpasize
+        _set_bin(self.info, self.bin)
+        self._loader = make_tile_loader(p, self.info['Npts'], fpasize, self.mmap,
+                                        self.bands, self.layout, exists=True, bin=self.bin,
+                                        spectral_bin=self.spectral_bin, stats=self.stats)
 
-        if self.MAT:
-            # Rotate and flip tile to match matplotlib/MATLAB image coordinates
-            data = np.flipud(data)
+        if DEBUG:
+            print("FPA Size is {}".format(fpasize))
+
+    def load(self):
+        """
+        Read the pixel data into .data and return it
+        """
+        with _phase(self.stats, 'load'):
+            data = self._loader()
+            if not data.flags.writeable:
+                # Shared with the process-wide TileCache
+                data = data.copy()
+
+            if self.MAT:
+                # Rotate and flip tile to match matplotlib/MATLAB image coordinates
+                data = _flip_rows(data, self.layout)
 
         self.data = data
+        _emit(self.stats, "load")
+        return data
 
-        if DEBUG:
-            print("FPA Size is {}".format(fpasize))
 
+# Default size cap of a DiskTileCache directory
+_DISK_CACHE_MAX_BYTES = 16 << 30
+
+
+class DiskTileCache(object):
+    """
+    Directory of converted tiles, stored once as contiguous .npy files in the
+    requested layout and returned as local memory maps on later loads
+
+    Entries are keyed by the source path, size and mtime (plus band selection and
+    layout), so changed source files are converted again. When the directory
+    grows beyond :max_bytes:, least recently used entries are removed.
+
+    Readers passed a cache directory as tile_cache= share one DiskTileCache per
+    directory, and with it the size cap and LRU order.
+
+    Args:
+        directory (str): Cache directory, created if needed
+        max_bytes (int): Size cap of the cache directory (default 16 GiB,
+                         None for unbounded)
+    """
+
+    def __init__(self, directory, max_bytes=_DISK_CACHE_MAX_BYTES):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # Entry name -> size, least recently used first
+        self._entries = OrderedDict()
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith(".npy"):
+                    st = entry.stat()
+                    entries.append((st.st_mtime, entry.name, st.st_size))
+        for _, name, size in sorted(entries):
+            self._entries[name] = size
+        self.nbytes = sum(self._entries.values())
+
+    def _name(self, source, st, key):
+        source = (source, st.st_size, st.st_mtime_ns) + key
+        return hashlib.sha1(repr(source).encode()).hexdigest() + ".npy"
+
+    def load(self, path, shape, read, *key, source=None):
+        """
+        Returns the tile of :path: from the cache as a np.memmap (copy-on-write)
+
+        On a miss (or an entry not matching :shape:), :read: is called to convert
+        the source tile, which is stored and returned. :key: items such as bands and
+        layout tell apart conversions of the same file. :source: is the resolved
+        path of the file, if already known (saves resolving it again).
+        """
+        if source is None:
+            source = Path(path).resolve().as_posix()
+        name = self._name(source, os.stat(path), key)
+        entry = self.directory.joinpath(name)
+        try:
+            tile = np.load(entry, mmap_mode='c')
+            if tile.shape == tuple(shape) and tile.dtype == np.dtype('<f4'):
+                self._used(name, entry)
+                return tile
+        except (OSError, ValueError):
+            # Missing, evicted or corrupt entry
+            pass
+        tile = read()
+        self._store(name, entry, tile)
+        return tile
+
+    def _used(self, name, entry):
+        with self._lock:
+            if name in self._entries:
+                self._entries.move_to_end(name)
+            else:
+                # Stored by another process
+                self._entries[name] = entry.stat().st_size
+                self.nbytes += self._entries[name]
+        try:
+            # Recency for other processes / later sessions
+            os.utime(entry)
+        except OSError:
+            pass
 
-def make_tile_loader(path, Npts, fpasize):
+    def _store(self, name, entry, tile):
+        tmp = entry.with_name("{}.{}.{}.tmp".format(name, os.getpid(), threading.get_ident()))
+        with open(tmp, 'wb') as f:
+            np.save(f, np.ascontiguousarray(tile, dtype='<f4'))
+        os.replace(tmp, entry)
+        size = entry.stat().st_size
+        with self._lock:
+            self.nbytes += size - self._entries.pop(name, 0)
+            self._entries[name] = size
+            if self.max_bytes is None:
+                return
+            while self.nbytes > self.max_bytes and self._entries:
+                old, old_size = self._entries.popitem(last=False)
+                self.nbytes -= old_size
+                try:
+                    self.directory.joinpath(old).unlink()
+                except OSError:
+                    # Already removed, or still mapped (Windows)
+                    pass
+
+    def clear(self):
+        """
+        Remove all cache entries
+        """
+        with self._lock:
+            for name in self._entries:
+                try:
+                    self.directory.joinpath(name).unlink()
+                except OSError:
+                    pass
+            self._entries.clear()
+            self.nbytes = 0
+
+
+class TileCache(object):
+    """
+    Thread-safe LRU cache of loaded tiles, bounded by their total size in bytes
+
+    Cached tiles are shared between callers and are therefore read-only.
+
+    Args:
+        max_bytes (int): Size budget; least recently used tiles are evicted beyond it
+
+    Attributes:
+        nbytes (int):    Size of the cached tiles
+        hits (int):      Number of tiles returned from the cache
+        misses (int):    Number of lookups not in the cache
+        evictions (int): Number of tiles evicted to stay within max_bytes
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._tiles = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """
+        Returns the tile cached under :key:, or None
+        """
+        with self._lock:
+            tile = self._tiles.get(key)
+            if tile is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._tiles.move_to_end(key)
+            return tile
+
+    def put(self, key, tile):
+        """
+        Cache :tile: (made read-only) under :key:, evicting as needed
+        """
+        if tile.nbytes > self.max_bytes:
+            return
+        tile.flags.writeable = False
+        with self._lock:
+            old = self._tiles.pop(key, None)
+            if old is not None:
+                self.nbytes -= old.nbytes
+            self._tiles[key] = tile
+            self.nbytes += tile.nbytes
+            while self.nbytes > self.max_bytes:
+                _, old = self._tiles.popitem(last=False)
+                self.nbytes -= old.nbytes
+                self.evictions += 1
+
+    def stats(self):
+        """
+        Returns a dict of the cache counters
+        """
+        with self._lock:
+            return {'tiles': len(self._tiles), 'nbytes': self.nbytes,
+                    'max_bytes': self.max_bytes, 'hits': self.hits,
+                    'misses': self.misses, 'evictions': self.evictions}
+
+    def clear(self):
+        """
+        Remove all tiles (counters are kept)
+        """
+        with self._lock:
+            self._tiles.clear()
+            self.nbytes = 0
+
+
+# Process-wide TileCache consulted by make_tile_loader (disabled when None)
+_TILE_CACHE = None
+
+def set_tile_cache(max_bytes):
+    """
+    Enable the process-wide in-memory tile cache with a budget of :max_bytes:,
+    or disable it with None. Returns the new TileCache (or None).
+    """
+    global _TILE_CACHE
+    _TILE_CACHE = TileCache(max_bytes) if max_bytes else None
+    return _TILE_CACHE
+
+def get_tile_cache():
+    """
+    Returns the process-wide TileCache, or None when disabled
+    """
+    return _TILE_CACHE
+
+# DiskTileCache of each resolved cache directory passed as tile_cache=
+_DISK_CACHES = {}
+_DISK_CACHES_LOCK = threading.Lock()
+
+def _tile_cache(cache, max_bytes=None):
+    """
+    Returns the DiskTileCache for :cache: (a DiskTileCache or directory), or None
+
+    One DiskTileCache is kept per directory, so the readers using it share its LRU
+    state and size cap (set to :max_bytes:, if given).
+    """
+    if cache is None or isinstance(cache, DiskTileCache):
+        return cache
+    directory = Path(cache).resolve()
+    with _DISK_CACHES_LOCK:
+        disk = _DISK_CACHES.get(directory)
+        if disk is None or not directory.is_dir():
+            # New, or removed since
+            disk = _DISK_CACHES[directory] = DiskTileCache(directory)
+        if max_bytes is not None:
+            disk.max_bytes = max_bytes
+    return disk
+
+def make_tile_loader(path, Npts, fpasize, mmap=False, bands=None, layout="bip", exists=None,
+                     cache=None, bin=1, spectral_bin=1, stats=None, source=None):
     """
     Returns a closure which will load the tile at :path: when called.
 
     If the file is not present at loading time, return expected array filled with NaNs
+    :exists: passes on a known (e.g. DirectoryIndex) presence of the file, which saves
+    checking it again at loading time.
+    If :mmap: is set, the tile is returned as a np.memmap view of the file.
+    If :bands: is set, only those band indices (of :Npts:) are read.
+    Tiles are returned in :layout: ("bip" or "bsq").
+    If :cache: (a DiskTileCache) is set, tiles are converted once and then mapped from it;
+    :source: is the resolved path of the tile keying the cache, if already known.
+    Tiles read into memory (or from :cache:) are kept in the process-wide TileCache,
+    if enabled (see set_tile_cache); tiles returned from it are read-only.
+    If :bin: > 1, tiles are block-averaged over :bin: x :bin: pixels as they are loaded.
+    If :spectral_bin: > 1, groups of that many adjacent bands (of :bands:) are averaged.
+    If :stats: (a LoadStats) is set, each tile read and copy into :out: is timed in it.
+
+    If called with :out:, the tile is copied into that array
+    instead of being returned, reading through the reusable buffer :buf: if provided.
+    :crop: selects a (rows, columns) slice pair of the tile to copy into :out:.
     """
-    def load_tile_data(path=path):
+    bands_key = None if bands is None else tuple(map(int, bands))
+
+    def load_tile_data(path=path, out=None, buf=None, crop=None):
         shape = (Npts, fpasize, fpasize)
-        shape_t = (shape[1], shape[2], shape[0])
-        if path.is_file():
-            with path.open(mode='rb') as f:
-                tile = np.fromfile(f, dtype='<f')
-            tile = _reshape_tile(tile, shape)
-        else:
-            tile = np.full(shape_t, np.nan, dtype='<f')
+        n_bands = shape[0] if bands is None else len(bands)
+        shape_t = (n_bands, shape[1], shape[2]) if layout == "bsq" else \
+                  (shape[1], shape[2], n_bands)
+        f_out = fpasize // bin
+        shape_out = _image_shape(f_out, f_out, n_bands // spectral_bin, layout)
+        tile = None
+        start = time.perf_counter()
+        if path.is_file() if exists is None else exists:
+            try:
+                # :buf: is sized for the (binned) output tile
+                binned = bin > 1 or spectral_bin > 1
+                buf_t = buf if out is not None and not binned else None
+                memory = _TILE_CACHE if not mmap else None
+                if memory is not None:
+                    st = os.stat(path)
+                    key = (os.fspath(path), st.st_size, st.st_mtime_ns, bands_key, layout)
+                    tile = memory.get(key)
+                if tile is None and cache is not None:
+                    tile = cache.load(path, shape_t,
+                                      lambda: _load_tile(path, shape, False, buf_t, bands, layout),
+                                      bands_key, layout, source=source)
+                    if memory is not None:
+                        # Read the mapped entry (or buf) into a tile of its own
+                        memory.put(key, np.array(tile))
+                elif tile is None:
+                    tile = _load_tile(path, shape, mmap, buf_t, bands, layout)
+                    if memory is not None:
+                        # buf is reused by the caller
+                        memory.put(key, tile if buf_t is None else tile.copy())
+            except FileNotFoundError:
+                # Removed since the directory was indexed
+                pass
+        if stats is not None and tile is not None:
+            stats.add_read(path, time.perf_counter() - start, tile.nbytes)
+        if tile is not None and spectral_bin > 1:
+            tile = _bin_bands(tile, spectral_bin, layout)
+        if tile is not None and bin > 1:
+            tile = _bin_tile(tile, bin, layout)
+        if out is not None:
+            start = time.perf_counter()
+            if tile is not None:
+                if crop is not None:
+                    tile = tile[(slice(None),) + crop if layout == "bsq" else crop]
+                _copy_tile(out, tile, layout)
+            else:
+                out[...] = np.nan
+            if stats is not None:
+                stats.add_copy(time.perf_counter() - start)
+            return out
+        if tile is None:
+            tile = np.full(shape_out, np.nan, dtype='<f')
         return tile
     return load_tile_data
 
 
-class agilentMosaicTiles(DataObject):
+def _fill_mosaic(data, tiles, fpasize, MAT, workers=None, roi=None, layout="bip"):
+    """
+    Load every tile in :tiles: and place it into the preallocated mosaic array :data:
+
+    Each tile writes a disjoint region of :data:, so with :workers: > 1 tiles are
+    loaded and copied concurrently by a thread pool (file reads and copies release the GIL).
+    Tiles are read into a reusable per-thread buffer and copied straight into :data:.
+
+    If :roi: (rows, columns) slices of the full mosaic are given, :data: holds only
+    that region; tiles outside it are not opened and overlapping tiles are cropped.
+    """
+    ytiles = tiles.shape[1]
+    shape = (data.shape[0 if layout == "bsq" else 2], fpasize, fpasize)
+    if roi is None:
+        roi = (slice(0, ytiles*fpasize), slice(0, tiles.shape[0]*fpasize))
+    local = threading.local()
+
+    def place_tile(xy):
+        x, y = xy
+        overlap = _roi_overlap(*_tile_slices(x, y, ytiles, fpasize, MAT), roi)
+        if overlap is None:
+            return
+        region, (crop_rows, crop_cols) = overlap
+        out = data[(slice(None),) + region if layout == "bsq" else region]
+        full = (crop_rows.stop - crop_rows.start,
+                crop_cols.stop - crop_cols.start) == (fpasize, fpasize)
+        if MAT:
+            # Rotate and flip tile to match matplotlib/MATLAB image coordinates
+            out = _flip_rows(out, layout)
+            crop_rows = slice(fpasize - crop_rows.stop, fpasize - crop_rows.start)
+        if not hasattr(local, 'buf'):
+            local.buf = np.empty(shape, dtype='<f')
+        crop = None if full else (crop_rows, crop_cols)
+        tiles[x, y](out=out, buf=local.buf, crop=crop)
+
+    if workers is None or workers <= 1:
+        for xy in np.ndindex(tiles.shape):
+            place_tile(xy)
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # Consume results to re-raise any exception from a worker
+            for _ in executor.map(place_tile, np.ndindex(tiles.shape)):
+                pass
+
+
+def _allocate(shape, dtype, out=None, max_memory=None, scratch_dir=None):
+    """
+    Returns the zero-filled array a mosaic of :shape: is assembled into
+
+    :out: may be an ndarray of :shape: and :dtype:, which is used as is, or a file name
+    which is created as a np.memmap. Otherwise the array is in memory, unless it would
+    exceed :max_memory: bytes; then it is a np.memmap of an anonymous temporary file
+    in :scratch_dir: (default: the system temporary directory).
+    """
+    dtype = np.dtype(dtype)
+    if isinstance(out, np.ndarray):
+        if out.shape != tuple(shape) or out.dtype != dtype:
+            raise ValueError("out array must have shape {} and dtype {}".format(
+                tuple(shape), dtype))
+        return out
+    if out is not None:
+        return np.memmap(out, dtype=dtype, mode='w+', shape=shape)
+    nbytes = int(np.prod(shape)) * dtype.itemsize
+    if max_memory is not None and nbytes > max_memory:
+        # New file is zero-filled; it is removed once the array is released
+        return np.memmap(tempfile.TemporaryFile(dir=scratch_dir), dtype=dtype,
+                         mode='w+', shape=shape)
+    return np.zeros(shape, dtype=dtype)
+
+def _allocate_shared(shape, dtype):
+    """
+    Returns (block, array): a new multiprocessing.shared_memory block and the
+    (zero-filled) array of :shape: and :dtype: backed by it
+    """
+    dtype = np.dtype(dtype)
+    # SharedMemory refuses size 0
+    nbytes = max(int(np.prod(shape)) * dtype.itemsize, 1)
+    block = shared_memory.SharedMemory(create=True, size=nbytes)
+    return block, np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+def _release_shared(block):
+    """
+    Close and unlink shared memory :block: of a mosaic collected (or still alive at
+    exit) without close_shared()
+    """
+    try:
+        block.close()
+    except BufferError:
+        # Views of it remain; the mapping goes with the process
+        pass
+    try:
+        block.unlink()
+    except FileNotFoundError:
+        pass
+
+def _attach_shared(name):
+    """
+    Returns the existing shared_memory block :name:, leaving unlinking it to its creator
+    """
+    try:
+        # Python 3.13+: do not let this process' resource tracker unlink it on exit
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+class SharedMosaic(object):
+    """
+    Picklable handle of a mosaic assembled in shared memory, see agilentMosaic(shared=True)
+
+    Send it to worker processes, which attach to the block by name and get
+    zero-copy (writable) views of their tiles:
+
+        with handle as mosaic:
+            for x, y, view in mosaic.iter_tiles(coords):
+                ...
+
+    Views must be released before the handle is closed. The creating agilentMosaic
+    owns the block and unlinks it in close_shared().
+
+    Attributes:
+        name (str):         Name of the shared_memory block
+        shape (tuple):      Shape of the mosaic array
+        dtype (np.dtype):   dtype of the mosaic array
+        layout (str):       "bip" or "bsq"
+        tiles_shape (tuple): (xtiles, ytiles)
+        fpasize (int):      Tile size in pixels
+        MAT (bool):         Mosaic is in image coordinates (matplotlib/MATLAB)
+        data (:obj:`ndarray`): The mosaic array, while attached
+    """
+
+    def __init__(self, name, shape, dtype, layout, tiles_shape, fpasize, MAT):
+        self.name = name
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.layout = layout
+        self.tiles_shape = tuple(tiles_shape)
+        self.fpasize = fpasize
+        self.MAT = MAT
+        self.data = None
+        self._block = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.update(data=None, _block=None)
+        return state
+
+    def attach(self):
+        """
+        Attach to the shared block and return the mosaic array (.data)
+        """
+        if self._block is None:
+            self._block = _attach_shared(self.name)
+            self.data = np.ndarray(self.shape, dtype=self.dtype, buffer=self._block.buf)
+        return self.data
+
+    def close(self):
+        """
+        Detach from the shared block (the block itself is left in place)
+        """
+        self.data = None
+        if self._block is not None:
+            self._block.close()
+            self._block = None
+
+    def __enter__(self):
+        self.attach()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def tile(self, x, y):
+        """
+        Returns the view of .data covered by tile (x, y), oriented as by iter_tiles()
+        """
+        rows, cols = _tile_slices(x, y, self.tiles_shape[1], self.fpasize, self.MAT)
+        data = self.attach()
+        return data[:, rows, cols] if self.layout == "bsq" else data[rows, cols]
+
+    def iter_tiles(self, coords=None):
+        """
+        Yield (x, y, view) for the tiles at :coords: (default: all, in file name order)
+        """
+        for (x, y) in np.ndindex(self.tiles_shape) if coords is None else coords:
+            yield x, y, self.tile(x, y)
+
+    def split(self, n):
+        """
+        Returns :n: lists of (x, y) tile coordinates, contiguous in file name order,
+        to assign to workers
+        """
+        coords = list(np.ndindex(self.tiles_shape))
+        bounds = np.linspace(0, len(coords), n + 1).round().astype(int)
+        return [coords[i:j] for i, j in zip(bounds[:-1], bounds[1:])]
+
+
+def _iter_tiles(tiles, fpasize, MAT, layout="bip", coords=None):
+    """
+    Yield (x, y, rows, columns, tile) for every tile in :tiles:, loading one at a time
+
+    rows/columns are the slices of the assembled mosaic covered by the tile, which is
+    already oriented (MAT flip applied) to be placed there as is.
+    Tiles are visited in file name order (x, then y) for directory/disk locality,
+    or only the (x, y) tiles in :coords: if given.
+    """
+    for (x, y) in np.ndindex(tiles.shape) if coords is None else coords:
+        yield _placed_tile(tiles, x, y, fpasize, MAT, layout)
+
+def _placed_tile(tiles, x, y, fpasize, MAT, layout="bip"):
+    """
+    Returns (x, y, rows, columns, tile) for tile (x, y), see _iter_tiles()
+    """
+    rows, cols = _tile_slices(x, y, tiles.shape[1], fpasize, MAT)
+    tile = tiles[x, y]()
+    if MAT:
+        # Rotate and flip tile to match matplotlib/MATLAB image coordinates
+        tile = _flip_rows(tile, layout)
+    return x, y, rows, cols, tile
+
+def _present_coords(present):
+    """
+    Returns the (x, y) coordinates of the tiles set in the :present: mask, in file name order
+    """
+    return [(int(x), int(y)) for x, y in np.argwhere(present)]
+
+def _load_sparse(tiles, coords, fpasize, MAT, layout="bip", dtype=np.float32, workers=None):
+    """
+    Returns {(x, y): tile} of the tiles at :coords:, oriented as by _iter_tiles()
+    """
+    def load(xy):
+        tile = _placed_tile(tiles, *xy, fpasize, MAT, layout)[4]
+        # Own copy: cached tiles are read-only and mmap tiles keep the file open
+        return np.array(tile, dtype=dtype)
+
+    if workers is None or workers <= 1:
+        loaded = [load(xy) for xy in coords]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            loaded = list(executor.map(load, coords))
+    return dict(zip(coords, loaded))
+
+def _iter_stored_tiles(tile_data, present, fpasize, MAT, tile_shape, coords=None):
+    """
+    Yield (x, y, rows, columns, tile) like _iter_tiles() from the already loaded
+    {(x, y): tile} :tile_data:; absent tiles are NaN arrays of :tile_shape:
+    """
+    for (x, y) in np.ndindex(present.shape) if coords is None else coords:
+        rows, cols = _tile_slices(x, y, present.shape[1], fpasize, MAT)
+        tile = tile_data.get((x, y))
+        if tile is None:
+            tile = np.full(tile_shape, np.nan, dtype='<f')
+        yield x, y, rows, cols, tile
+
+def _densify(data, tile_data, present, fpasize, MAT, layout="bip"):
+    """
+    Place the {(x, y): tile} :tile_data: into the full mosaic array :data:,
+    filling the regions of absent tiles with NaN
+    """
+    for (x, y) in np.ndindex(present.shape):
+        rows, cols = _tile_slices(x, y, present.shape[1], fpasize, MAT)
+        region = (slice(None), rows, cols) if layout == "bsq" else (rows, cols)
+        data[region] = tile_data[x, y] if present[x, y] else np.nan
+
+
+class TilePrefetcher(object):
+    """
+    Iterator yielding (x, y, rows, columns, tile) like _iter_tiles(), while the next
+    :depth: tiles are loaded by background threads. :coords: limits it to those (x, y) tiles.
+
+    At most :depth: tiles are loading or waiting besides the one handed out, which
+    bounds memory. Use as a context manager (or call close()) to stop early.
+
+    Attributes:
+        depth (int):        Number of tiles read ahead
+        stall_time (float): Seconds the consumer spent waiting for a tile
+        stalls (int):       Number of tiles which were not ready when requested
+    """
+
+    def __init__(self, tiles, fpasize, MAT, layout="bip", depth=2, workers=None, coords=None):
+        if depth < 1:
+            raise ValueError("depth must be at least 1")
+        self.depth = depth
+        self.stall_time = 0.
+        self.stalls = 0
+        self._load = functools.partial(_placed_tile, tiles, fpasize=fpasize, MAT=MAT,
+                                       layout=layout)
+        self._coords = iter(np.ndindex(tiles.shape) if coords is None else coords)
+        self._pending = deque()
+        self._executor = ThreadPoolExecutor(max_workers=workers or depth)
+        for _ in range(depth):
+            self._submit()
+
+    def _submit(self):
+        xy = next(self._coords, None)
+        if xy is not None:
+            self._pending.append(self._executor.submit(self._load, *xy))
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if not self._pending:
+            self.close()
+            raise StopIteration
+        future = self._pending.popleft()
+        if not future.done():
+            self.stalls += 1
+            start = time.perf_counter()
+            try:
+                future.result()
+            finally:
+                self.stall_time += time.perf_counter() - start
+        # Keep :depth: tiles in flight while the consumer works on this one
+        self._submit()
+        return future.result()
+
+    def close(self):
+        """
+        Cancel outstanding reads and stop the background threads
+        """
+        for future in self._pending:
+            future.cancel()
+        self._pending.clear()
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+async def _load_tile_async(tiles, x, y, executor=None):
+    """
+    Await tile (x, y) of :tiles: loaded in :executor: (default: the loop's executor)
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, tiles[x, y])
+
+async def _load_tiles_async(tiles, coords=None, limit=None, executor=None):
+    """
+    Await the tiles at :coords: (default: all, in file name order), with at most
+    :limit: loads in flight at once
+    """
+    if coords is None:
+        coords = list(np.ndindex(tiles.shape))
+    semaphore = asyncio.Semaphore(limit) if limit else None
+
+    async def load(xy):
+        if semaphore is None:
+            return await _load_tile_async(tiles, *xy, executor=executor)
+        async with semaphore:
+            return await _load_tile_async(tiles, *xy, executor=executor)
+
+    return await asyncio.gather(*(load(xy) for xy in coords))
+
+
+class _MosaicTilesMixin(object):
+    """
+    Tile access shared by agilentMosaicTiles and agilentMosaicIFGTiles
+    """
+
+    def check_tiles(self):
+        """
+        Report missing and short (truncated) tile files from the directory scan alone
+
+        Returns:
+            dict with 'missing' and 'short' lists of (x, y) tile coordinates
+        """
+        return self.index.check_tiles(*self._tile_key, self.tiles.shape, self._tile_nbytes)
+
+    def iter_tiles(self, prefetch=0, workers=None, skip_missing=None, coords=None):
+        """
+        Yield (x, y, rows, columns, tile) one tile at a time
+
+        rows/columns slice the assembled (height x width) mosaic, and tile is oriented
+        to match (MAT applied), e.g. data[rows, columns] = tile for layout="bip".
+        Only one tile is held at a time, so memory is bounded by the consumer.
+
+        With :prefetch: > 0 a TilePrefetcher is returned, which reads that many tiles
+        ahead in (:workers:, default :prefetch:) background threads and records the
+        time spent waiting for reads in .stall_time.
+
+        With :skip_missing: (default: .sparse) tiles absent from .present are not
+        visited, instead of yielding NaN tiles. Tiles already loaded in sparse mode
+        are yielded from .tile_data without reading the files again.
+        With :coords:, only those (x, y) tiles are visited.
+        """
+        if skip_missing is None:
+            skip_missing = self.sparse
+        if skip_missing:
+            coords = _present_coords(self.present) if coords is None else \
+                     [xy for xy in coords if self.present[xy]]
+        fpasize = self.info['fpasize']
+        if self.tile_data is not None:
+            tile_shape = _image_shape(fpasize, fpasize, self.info['Npts'], self.layout)
+            return _iter_stored_tiles(self.tile_data, self.present, fpasize, self.MAT,
+                                      tile_shape, coords)
+        if prefetch:
+            return TilePrefetcher(self.tiles, fpasize, self.MAT, self.layout,
+                                  prefetch, workers, coords)
+        return _iter_tiles(self.tiles, fpasize, self.MAT, self.layout, coords)
+
+    async def load_async(self, x, y, executor=None):
+        """
+        Await tile (x, y) loaded in :executor: (default: the event loop's executor)
+        """
+        return await _load_tile_async(self.tiles, x, y, executor)
+
+    async def load_tiles_async(self, coords=None, limit=None, executor=None):
+        """
+        Await a list of the tiles at :coords: (default: all), loading at most
+        :limit: tiles concurrently
+        """
+        return await _load_tiles_async(self.tiles, coords, limit, executor)
+
+
+class _MosaicDataMixin(object):
+    """
+    Loading and assembly shared by agilentMosaic and agilentMosaicIFG
+    """
+
+    def load(self):
+        """
+        Read the pixel data into .data and return it (.tile_data in sparse mode)
+        """
+        self._get_data()
+        return self.tile_data if self.sparse else self.data
+
+    def densify(self):
+        """
+        Assemble .data from the sparse .tile_data (loading it first if needed), with
+        NaN where tiles are absent, and return it
+        """
+        if self.tile_data is None:
+            self.tile_data = _load_sparse(self.tiles, _present_coords(self.present),
+                                          self.info['fpasize'], self.MAT, self.layout,
+                                          self.dtype, self.workers)
+        data = self._allocate()
+        _densify(data, self.tile_data, self.present, self.info['fpasize'], self.MAT,
+                 self.layout)
+        if isinstance(self.out, (str, os.PathLike)):
+            data.flush()
+        self.data = data
+        return data
+
+    def _get_data(self):
+        with _phase(self.stats, 'load'):
+            self._assemble()
+        _emit(self.stats, "load")
+
+    def _assemble(self):
+        fpasize = self.info['fpasize']
+        if self.sparse:
+            # Only the tiles present are read and kept
+            self.tile_data = _load_sparse(self.tiles, _present_coords(self.present), fpasize,
+                                          self.MAT, self.layout, self.dtype, self.workers)
+            return
+        # Allocate array
+        # (rows, columns, wavenumbers) or (wavenumbers, rows, columns)
+        data = self._allocate()
+        if DEBUG:
+            print("self.tiles: ", self.tiles.shape)
+            print("self.data: ", data.shape)
+
+        _fill_mosaic(data, self.tiles, fpasize, self.MAT, self.workers, self.roi,
+                     self.layout)
+        if isinstance(self.out, (str, os.PathLike)):
+            # Backing file requested by the caller
+            data.flush()
+
+        self.data = data
+
+    def _allocate(self):
+        return _allocate(self.shape, self.dtype, self.out, self.max_memory, self.scratch_dir)
+
+
+class agilentMosaicTiles(_MosaicTilesMixin, DataObject):
     """
     UNSTABLE API
 
@@ -384,39 +1855,70 @@ class agilentMosaicTiles(DataObject):
     The API is not considered stable at this time, so if you wish to load
     mosaic files with a stable interface, use agilentMosaic as in previous
     versions.
+
+    Passing wavenumber_range=(lo, hi) or a list of band indices as bands= restricts
+    the tile loaders to those wavenumbers, and trims .wavenumbers/.info to match.
+    layout="bsq" makes the loaders return (wavenumbers x rows x columns) tiles.
+    tile_cache (a DiskTileCache or cache directory) maps converted tiles from a local
+    cache instead of reading the source files again; tile_cache_max_bytes sets the
+    size cap of a cache directory (default 16 GiB).
+    bin=n block-averages n x n pixels of each tile as it is loaded, and spectral_bin=n
+    (or a target resolution= in cm-1) averages groups of n adjacent bands.
+    .present is the (xtiles, ytiles) mask of tiles whose files exist.
+    stats=True (or a hook function) collects a LoadStats record in .stats, which
+    also records the tile reads made through the loaders.
+    index= reuses an existing DirectoryIndex of the file's directory.
     """
 
-    def __init__(self, filename, MAT=False):
+    def __init__(self, filename, MAT=False, mmap=False, wavenumber_range=None, bands=None,
+                 layout="bip", tile_cache=None, bin=1, spectral_bin=1, resolution=None,
+                 stats=None, index=None, tile_cache_max_bytes=None):
         super().__init__()
-        p = check_files(filename, [".dmt", ".dmd"])
+        self.bin = bin
+        self.sparse = False
+        self.tile_data = None
+        self.tile_cache = _tile_cache(tile_cache, tile_cache_max_bytes)
+        self.stats = _load_stats(self, filename, stats)
+        with _phase(self.stats, 'scan'):
+            self.index = _index_for(Path(filename), index)
+        with _phase(self.stats, 'resolve'):
+            p = check_files(filename, [".dmt", ".dmd"], self.index)
         self.MAT = MAT
-        self._get_dmt_info(p)
-        self._get_tiles(p)
+        self.mmap = mmap
+        self.layout = _check_layout(layout)
+        with _phase(self.stats, 'header'):
+            self._get_dmt_info(p)
+        self.bands = _resolve_bands(self.info['wavenumbers'], wavenumber_range, bands)
+        self.spectral_bin = _spectral_bin_factor(self.info, spectral_bin, resolution)
+        self.bands = _spectral_bin_bands(self.bands, self.info['Npts'], self.spectral_bin)
+        with _phase(self.stats, 'setup'):
+            self._get_tiles(p)
+        _select_bands(self.info, self.bands)
+        _set_spectral_bin(self.info, self.spectral_bin)
 
         self.wavenumbers = self.info['wavenumbers']
         self.width = self.tiles.shape[0] * self.info['fpasize']
         self.height = self.tiles.shape[1] * self.info['fpasize']
-        self.filename = dmt_path(p).as_posix()
+        self.filename = dmt_path(p, self.index).as_posix()
         self.acqdate = self.info['Time Stamp']
 
-        self.vis = get_visible_images(p)
+        with _phase(self.stats, 'vis'):
+            self.vis = get_visible_images(p, self.index)
+        _emit(self.stats, "open")
 
     def _get_dmt_info(self, p_in):
-        p = dmt_path(p_in)
-        with p.open(mode='rb') as f:
-            self.info.update(_get_wavenumbers(f))
-            self.info.update(_get_params(f))
+        self.header = agilentHeader.from_path(dmt_path(p_in, self.index))
+        self.info.update(_get_wavenumbers(self.header))
+        self.info.update(_get_params(self.header))
 
     def _get_tiles(self, p_in):
         # Determine mosiac dimensions by counting .dmd files
-        xtiles = sum(1 for _ in
-                p_in.parent.glob(p_in.stem + "_[0-9][0-9][0-9][0-9]_0000.dmd"))
-        ytiles = sum(1 for _ in
-                p_in.parent.glob(p_in.stem + "_0000_[0-9][0-9][0-9][0-9].dmd"))
+        xtiles, ytiles = self.index.tile_counts(p_in.stem, ".dmd")
+        tile_names = self.index.tiles(p_in.stem, ".dmd")
         # _0000_0000.dmd primary file
-        p = p_in.parent.joinpath(p_in.stem + "_0000_0000.dmd")
         Npts = self.info['Npts']
-        fpasize = self.info['fpasize'] = _fpa_size(p.stat().st_size / 4, Npts)
+        fpasize = _fpa_size(self.index.size(tile_names[0, 0]) / 4, Npts)
+        self.info['fpasize'] = fpasize
 
         if DEBUG:
             print("{0} x {1} tiles found".format(xtiles, ytiles))
@@ -425,13 +1927,29 @@ class agilentMosaicTiles(DataObject):
                 xtiles*fpasize, ytiles*fpasize, xtiles*ytiles*fpasize**2))
 
         tiles = np.zeros((xtiles, ytiles), dtype=object)
+        present = np.zeros((xtiles, ytiles), dtype=bool)
+        # Resolved once, to key the tile cache entries
+        root = p_in.parent.resolve() if self.tile_cache is not None else None
         for (x, y) in np.ndindex(tiles.shape):
-            p_dmd = p_in.parent.joinpath(p_in.stem + "_{0:04d}_{1:04d}.dmd".format(x,y))
-            tiles[x, y] = make_tile_loader(p_dmd, Npts, fpasize)
+            name = tile_names.get((x, y))
+            exists = present[x, y] = name is not None
+            if not exists:
+                name = p_in.stem + "_{0:04d}_{1:04d}.dmd".format(x,y)
+            p_dmd = p_in.parent.joinpath(name)
+            source = None if root is None else root.joinpath(name).as_posix()
+            tiles[x, y] = make_tile_loader(p_dmd, Npts, fpasize, self.mmap, self.bands,
+                                           self.layout, exists=exists,
+                                           cache=self.tile_cache, bin=self.bin,
+                                           spectral_bin=self.spectral_bin, stats=self.stats,
+                                           source=source)
         self.tiles = tiles
+        self.present = present
+        _set_bin(self.info, self.bin)
+        self._tile_nbytes = 1020 + Npts * fpasize**2 * 4
+        self._tile_key = (p_in.stem, ".dmd")
 
 
-class agilentMosaic(agilentMosaicTiles):
+class agilentMosaic(_MosaicDataMixin, agilentMosaicTiles):
     """
     Extracts the spectra from an Agilent mosaic FPA image.
 
@@ -441,51 +1959,215 @@ class agilentMosaic(agilentMosaicTiles):
         filename (str):   full path to .dmt file
         MAT (bool):       Output array using image coordinates (matplotlib/MATLAB)
         dtype (np.dtype): Set dtype of output array (float32 or float64)
+        mmap (bool):      Memory-map tile files instead of reading them
+        workers (int):    Number of threads loading tiles concurrently (default: serial)
+        wavenumber_range (tuple): Only load wavenumbers within (lo, hi)
+        bands (list):     Only load these band indices (sorted)
+        roi (tuple):      Only load this region, as ((row start, stop), (column start, stop))
+        roi_units (str):  "px" for pixel rows/columns of .data, or "um" for ((y0, y1), (x0, x1))
+                          microns in the frame of .vis (origin at bottom-left of the IR mosaic)
+        layout (str):     "bip" (height x width x wavenumbers) or
+                          "bsq" (wavenumbers x height x width, as stored on disk)
+        load_data (bool): Read the pixel data now, otherwise only on .load()
+        out (str):        Assemble into this ndarray, or a np.memmap created at this file name
+        max_memory (int): Assemble into a temporary np.memmap when .data would exceed
+                          this many bytes
+        scratch_dir (str): Directory for the max_memory temporary file
+        tile_cache (str): DiskTileCache (or its directory) of converted tiles to map from
+        tile_cache_max_bytes (int): Size cap of a tile_cache directory (default 16 GiB)
+        bin (int):        Block-average bin x bin pixels of each tile while loading
+        spectral_bin (int): Average groups of this many adjacent bands while loading
+        resolution (float): Target spectral resolution (cm-1) instead of spectral_bin,
+                            a whole multiple of the acquired Resolution. With either,
+                            info['Resolution'] and 'PtSep' are scaled and 'StartPt'
+                            is the (fractional) centre of the first group
+        sparse (bool):    Keep only the tiles present in .tile_data instead of
+                          assembling .data; densify() builds .data on demand
+        shared (bool):    Assemble .data in a multiprocessing.shared_memory block
+        stats:            True, or a hook function called with the LoadStats record, to
+                          collect per-phase timing in .stats ("memory": and peak memory)
+        index (DirectoryIndex): Existing index of the file's directory to reuse
 
     Attributes:
         info (dict):            Dictionary of acquisition information
         data (:obj:`ndarray`):  3-dimensional array (height x width x wavenumbers)
+        shape (tuple):          Shape of .data, available before loading
+        tiles (:obj:`ndarray`): (xtiles, ytiles) array of tile loaders
+        present (:obj:`ndarray`): (xtiles, ytiles) mask of tiles whose files exist
+        tile_data (dict):       {(x, y): tile} of the present tiles in sparse mode,
+                                oriented as iter_tiles() yields them
+        shared (SharedMosaic):  Handle for worker processes to attach to .data,
+                                once loaded with shared=True
+        stats (LoadStats):      Timing and memory record, if requested (else None)
         wavenumbers (list):     Wavenumbers in order of .data array
         width (int):            Width of mosaic in pixels (rows)
         height (int):           Width of mosaic in pixels (columns)
         filename (str):         Full path to .dmt file
         acqdate (str):          Date and time of acquisition
+        header (agilentHeader): Indexed .dmt header properties
 
     Based on agilent-file-formats MATLAB code by Alex Henderson:
     https://bitbucket.org/AlexHenderson/agilent-file-formats
     """
 
-    def __init__(self, filename, MAT=False, dtype=np.float32):
-        super().__init__(filename, MAT)
+    def __init__(self, filename, MAT=False, dtype=np.float32, mmap=False, workers=None,
+                 wavenumber_range=None, bands=None, roi=None, roi_units="px", layout="bip",
+                 load_data=True, out=None, max_memory=None, scratch_dir=None, tile_cache=None,
+                 bin=1, spectral_bin=1, resolution=None, sparse=False, shared=False,
+                 stats=None, index=None, tile_cache_max_bytes=None):
+        super().__init__(filename, MAT=MAT, mmap=mmap, wavenumber_range=wavenumber_range,
+                         bands=bands, layout=layout, tile_cache=tile_cache, bin=bin,
+                         spectral_bin=spectral_bin, resolution=resolution, stats=stats,
+                         index=index, tile_cache_max_bytes=tile_cache_max_bytes)
+        if sparse and roi is not None:
+            raise ValueError("roi is not supported in sparse mode")
+        if shared and (roi is not None or out is not None):
+            raise ValueError("roi and out are not supported with shared=True")
+        self.sparse = sparse
+        self._shared = shared
+        self._block = None
+        self._release = None
+        self.shared = None
         self.dtype = dtype
-        self._get_data()
+        self.workers = workers
+        self.out = out
+        self.max_memory = max_memory
+        self.scratch_dir = scratch_dir
+        self.roi = None
+        if roi is not None:
+            self.roi = _resolve_roi(roi, roi_units, (self.height, self.width),
+                                    self.info, self.MAT)
+            self.info['roi'] = tuple((r.start, r.stop) for r in self.roi)
+            self.height, self.width = (r.stop - r.start for r in self.roi)
+        self.shape = _image_shape(self.height, self.width, self.info['Npts'], self.layout)
+        if load_data:
+            self._get_data()
+
+    def _allocate(self):
+        if not self._shared:
+            return super()._allocate()
+        # Reloading replaces the block
+        self.close_shared()
+        self._block, data = _allocate_shared(self.shape, self.dtype)
+        # Unlinks the block if close_shared() is never called
+        self._release = weakref.finalize(self, _release_shared, self._block)
+        self.shared = SharedMosaic(self._block.name, self.shape, self.dtype, self.layout,
+                                   self.tiles.shape, self.info['fpasize'], self.MAT)
+        return data
+
+    def close_shared(self):
+        """
+        Release .data and unlink its shared memory block (shared=True)
+
+        Worker processes should have closed their SharedMosaic handles first, and
+        no views of .data may be kept in this process.
+        """
+        if self._block is None:
+            return
+        self.data = np.array([])
+        self.shared = None
+        self._release.detach()
+        self._release = None
+        self._block.close()
+        self._block.unlink()
+        self._block = None
 
-    def _get_data(self):
-        xtiles = self.tiles.shape[0]
-        ytiles = self.tiles.shape[1]
-        Npts = self.info['Npts']
-        fpasize = self.info['fpasize']
-        # Allocate array
-        # (rows, columns, wavenumbers)
-        data = np.zeros((ytiles*fpasize, xtiles*fpasize, Npts),
-                        dtype=self.dtype)
-        if DEBUG:
-            print("self.tiles: ", self.tiles.shape)
-            print("self.data: ", data.shape)
 
-        for (x, y) in np.ndindex(self.tiles.shape):
-            tile = self.tiles[x, y]()
-            if self.MAT:
-                # Rotate and flip tile to match matplotlib/MATLAB image coordinates
-                tile = np.flipud(tile)
-                data[y*fpasize:(y+1)*fpasize, x*fpasize:(x+1)*fpasize, :] = tile
-            else:
-                # Tile data is in normal cartesian coordinates
-                # but tile numbering (000x_000y)
-                # is left-to-right, top-to-bottom (image coordinates)
-                data[(ytiles-y-1)*fpasize:(ytiles-y)*fpasize, (x)*fpasize:(x+1)*fpasize, :] = tile
+def _key_indices(key, n):
+    """
+    Returns (indices, is_scalar) for a basic index along an axis of length :n:
+    """
+    if isinstance(key, slice):
+        return np.arange(n)[key], False
+    try:
+        i = operator.index(key)
+    except TypeError:
+        raise IndexError("Only integers, slices and Ellipsis are valid indices")
+    if not -n <= i < n:
+        raise IndexError("Index {} is out of bounds for axis with size {}".format(i, n))
+    return np.array([i % n]), True
+
+
+class LazyMosaicArray(object):
+    """
+    Read-only array-like view of a mosaic which loads only the tiles a slice touches.
 
-        self.data = data
+    Supports NumPy basic indexing (integers, slices and Ellipsis). Indexing returns
+    an ndarray oriented as agilentMosaic.data would be for the same MAT and layout settings.
+
+    Args:
+        mosaic:           agilentMosaicTiles or agilentMosaicIFGTiles instance
+        dtype (np.dtype): Set dtype of returned arrays (float32 or float64)
+
+    Attributes:
+        shape (tuple):    Shape of the full mosaic (height x width x wavenumbers,
+                          or wavenumbers x height x width for layout "bsq")
+        dtype (np.dtype): dtype of returned arrays
+        ndim (int):       Number of dimensions (3)
+    """
+
+    def __init__(self, mosaic, dtype=np.float32):
+        self.tiles = mosaic.tiles
+        self.MAT = mosaic.MAT
+        self.layout = mosaic.layout
+        self.fpasize = mosaic.info['fpasize']
+        xtiles, ytiles = self.tiles.shape
+        shape = (ytiles*self.fpasize, xtiles*self.fpasize, mosaic.info['Npts'])
+        self.shape = shape[2:] + shape[:2] if self.layout == "bsq" else shape
+        self.dtype = np.dtype(dtype)
+        self.ndim = len(self.shape)
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __array__(self, dtype=None, copy=None):
+        data = self[...]
+        if dtype is not None:
+            data = data.astype(dtype, copy=False)
+        return data
+
+    def _normalize_key(self, key):
+        if not isinstance(key, tuple):
+            key = (key,)
+        if any(k is Ellipsis for k in key):
+            i = next(i for i, k in enumerate(key) if k is Ellipsis)
+            fill = (slice(None),) * (self.ndim - len(key) + 1)
+            key = key[:i] + fill + key[i+1:]
+        if len(key) > self.ndim:
+            raise IndexError("Too many indices for array")
+        return key + (slice(None),) * (self.ndim - len(key))
+
+    def __getitem__(self, key):
+        key = self._normalize_key(key)
+        shape = self.shape
+        if self.layout == "bsq":
+            # Work in (rows, columns, wavenumbers) order
+            key = key[1:] + key[:1]
+            shape = shape[1:] + shape[:1]
+        (rows, r_sc), (cols, c_sc), (wns, w_sc) = \
+            (_key_indices(k, n) for k, n in zip(key, shape))
+        fpasize = self.fpasize
+        ytiles = self.tiles.shape[1]
+        out = np.empty((len(rows), len(cols), len(wns)), dtype=self.dtype)
+        for row in np.unique(rows // fpasize):
+            r_out = np.nonzero(rows // fpasize == row)[0]
+            for col in np.unique(cols // fpasize):
+                c_out = np.nonzero(cols // fpasize == col)[0]
+                y = row if self.MAT else ytiles - row - 1
+                tile = self.tiles[col, y]()
+                if self.layout == "bsq":
+                    tile = np.transpose(tile, (1,2,0))
+                if self.MAT:
+                    # Rotate and flip tile to match matplotlib/MATLAB image coordinates
+                    tile = np.flipud(tile)
+                out[np.ix_(r_out, c_out)] = tile[np.ix_(rows[r_out] % fpasize,
+                                                        cols[c_out] % fpasize,
+                                                        wns)]
+        scalars = (r_sc, c_sc, w_sc)
+        if self.layout == "bsq":
+            out = np.moveaxis(out, 2, 0)
+            scalars = scalars[2:] + scalars[:2]
+        return out[tuple(0 if sc else slice(None) for sc in scalars)]
 
 
 class agilentImageIFG(DataObject):
@@ -495,47 +2177,81 @@ class agilentImageIFG(DataObject):
     Args:
         filename (str): full path to .seq file
         MAT (bool):     Output array using image coordinates (matplotlib/MATLAB)
+        mmap (bool):    Memory-map the .seq file instead of reading it
+        layout (str):   "bip" (height x width x points) or
+                        "bsq" (points x height x width, as stored on disk)
+        load_data (bool): Read the pixel data now, otherwise only on .load()
+        stats:          True, or a hook function called with the LoadStats record, to
+                        collect per-phase timing in .stats ("memory": and peak memory)
+        index (DirectoryIndex): Existing index of the file's directory to reuse
 
     Attributes:
         info (dict):            Dictionary of acquisition information
         data (:obj:`ndarray`):  3-dimensional array (height x width x wavenumbers)
+        shape (tuple):          Shape of .data, available before loading
+        stats (LoadStats):      Timing and memory record, if requested (else None)
         filename (str):         Full path to .bsp file
     """
 
-    def __init__(self, filename, MAT=False):
+    def __init__(self, filename, MAT=False, mmap=False, layout="bip", load_data=True,
+                 stats=None, index=None):
         super().__init__()
-        p = check_files(filename, [".seq", ".bsp"])
+        self.stats = _load_stats(self, filename, stats)
+        with _phase(self.stats, 'scan'):
+            self.index = _index_for(Path(filename), index)
+        with _phase(self.stats, 'resolve'):
+            p = check_files(filename, [".seq", ".bsp"], self.index)
         self.MAT = MAT
-        self._get_bsp_info(p)
-        self._get_seq(p)
+        self.mmap = mmap
+        self.layout = _check_layout(layout)
+        with _phase(self.stats, 'header'):
+            self._get_bsp_info(p)
+        with _phase(self.stats, 'setup'):
+            self._get_seq(p)
 
-        self.filename = bsp_path(p).as_posix()
+        fpasize = self.info['fpasize']
+        self.shape = _image_shape(fpasize, fpasize, self.info['Npts'], self.layout)
+        self.filename = bsp_path(p, self.index).as_posix()
+        _emit(self.stats, "open")
+        if load_data:
+            self.load()
 
     def _get_bsp_info(self, p_in):
-        p = bsp_path(p_in)
-        with p.open(mode='rb') as f:
-            self.info.update(_get_wavenumbers(f))  # All but 'wavenumbers' will be replaced in get_ifg_params
-            self.info.update(_get_ifg_params(f))
-            self.info.update(_get_params(f))
+        self.header = agilentHeader.from_path(bsp_path(p_in, self.index))
+        self.info.update(_get_wavenumbers(self.header))  # All but 'wavenumbers' will be replaced in get_ifg_params
+        self.info.update(_get_ifg_params(self.header))
+        self.info.update(_get_params(self.header))
 
     def _get_seq(self, p_in):
-        p = p_in.with_suffix(".seq")
-        with p.open(mode='rb') as f:
-            data = np.fromfile(f, dtype='<f')
-        fpasize = _fpa_size(data.size, self.info['Npts'])
-        data = _reshape_tile(data, (self.info['Npts'], fpasize, fpasize))
-
-        if self.MAT:
-            # Rotate and flip tile to match matplotlib/MATLAB image coordinates
-            data = np.flipud(data)
-
-        self.data = data
+        p = self.index.find(p_in.with_suffix(".seq").name)
+        fpasize = _fpa_size(self.index.size(p.name) / 4, self.info['Npts'])
+        self.info['fpasize'] = fpasize
+        self._loader = make_tile_loader(p, self.info['Npts'], fpasize, self.mmap,
+                                        layout=self.layout, exists=True, stats=self.stats)
 
         if DEBUG:
             print("FPA Size is {}".format(fpasize))
 
+    def load(self):
+        """
+        Read the pixel data into .data and return it
+        """
+        with _phase(self.stats, 'load'):
+            data = self._loader()
+            if not data.flags.writeable:
+                # Shared with the process-wide TileCache
+                data = data.copy()
 
-class agilentMosaicIFGTiles(DataObject):
+            if self.MAT:
+                # Rotate and flip tile to match matplotlib/MATLAB image coordinates
+                data = _flip_rows(data, self.layout)
+
+        self.data = data
+        _emit(self.stats, "load")
+        return data
+
+
+class agilentMosaicIFGTiles(_MosaicTilesMixin, DataObject):
     """
     UNSTABLE API
 
@@ -545,33 +2261,54 @@ class agilentMosaicIFGTiles(DataObject):
     The API is not considered stable at this time, so if you wish to load
     mosaic files with a stable interface, use agilentMosaicIFG as in previous
     versions.
+
+    layout="bsq" makes the loaders return (points x rows x columns) tiles.
+    tile_cache (a DiskTileCache or cache directory) maps converted tiles from a local
+    cache instead of reading the source files again; tile_cache_max_bytes sets the
+    size cap of a cache directory (default 16 GiB).
+    bin=n block-averages n x n pixels of each tile as it is loaded.
+    .present is the (xtiles, ytiles) mask of tiles whose files exist.
+    stats=True (or a hook function) collects a LoadStats record in .stats, which
+    also records the tile reads made through the loaders.
+    index= reuses an existing DirectoryIndex of the file's directory.
     """
 
-    def __init__(self, filename, MAT=False):
+    def __init__(self, filename, MAT=False, mmap=False, layout="bip", tile_cache=None, bin=1,
+                 stats=None, index=None, tile_cache_max_bytes=None):
         super().__init__()
-        p = check_files(filename, [".dmt", ".drd"])
+        self.bin = bin
+        self.sparse = False
+        self.tile_data = None
+        self.tile_cache = _tile_cache(tile_cache, tile_cache_max_bytes)
+        self.stats = _load_stats(self, filename, stats)
+        with _phase(self.stats, 'scan'):
+            self.index = _index_for(Path(filename), index)
+        with _phase(self.stats, 'resolve'):
+            p = check_files(filename, [".dmt", ".drd"], self.index)
         self.MAT = MAT
-        self._get_dmt_info(p)
-        self._get_tiles(p)
+        self.mmap = mmap
+        self.layout = _check_layout(layout)
+        with _phase(self.stats, 'header'):
+            self._get_dmt_info(p)
+        with _phase(self.stats, 'setup'):
+            self._get_tiles(p)
 
-        self.filename = dmt_path(p).as_posix()
+        self.filename = dmt_path(p, self.index).as_posix()
+        _emit(self.stats, "open")
 
     def _get_dmt_info(self, p_in):
-        p = dmt_path(p_in)
-        with p.open(mode='rb') as f:
-            self.info.update(_get_ifg_params(f))
-            self.info.update(_get_params(f))
+        self.header = agilentHeader.from_path(dmt_path(p_in, self.index))
+        self.info.update(_get_ifg_params(self.header))
+        self.info.update(_get_params(self.header))
 
     def _get_tiles(self, p_in):
         # Determine mosiac dimensions by counting .drd files
-        xtiles = sum(1 for _ in
-                p_in.parent.glob(p_in.stem + "_[0-9][0-9][0-9][0-9]_0000.drd"))
-        ytiles = sum(1 for _ in
-                p_in.parent.glob(p_in.stem + "_0000_[0-9][0-9][0-9][0-9].drd"))
+        xtiles, ytiles = self.index.tile_counts(p_in.stem, ".drd")
+        tile_names = self.index.tiles(p_in.stem, ".drd")
         # _0000_0000.drd primary file
-        p = p_in.parent.joinpath(p_in.stem + "_0000_0000.drd")
         Npts = self.info['Npts']
-        fpasize = self.info['fpasize'] = _fpa_size(p.stat().st_size / 4, Npts)
+        fpasize = _fpa_size(self.index.size(tile_names[0, 0]) / 4, Npts)
+        self.info['fpasize'] = fpasize
 
         if DEBUG:
             print("{0} x {1} tiles found".format(xtiles, ytiles))
@@ -580,13 +2317,29 @@ class agilentMosaicIFGTiles(DataObject):
                 xtiles*fpasize, ytiles*fpasize, xtiles*ytiles*fpasize**2))
 
         tiles = np.zeros((xtiles, ytiles), dtype=object)
+        present = np.zeros((xtiles, ytiles), dtype=bool)
+        # Resolved once, to key the tile cache entries
+        root = p_in.parent.resolve() if self.tile_cache is not None else None
         for (x, y) in np.ndindex(tiles.shape):
-            p_drd = p_in.parent.joinpath(p_in.stem + "_{0:04d}_{1:04d}.drd".format(x,y))
-            tiles[x, y] = make_tile_loader(p_drd, Npts, fpasize)
+            name = tile_names.get((x, y))
+            exists = present[x, y] = name is not None
+            if not exists:
+                name = p_in.stem + "_{0:04d}_{1:04d}.drd".format(x,y)
+            p_drd = p_in.parent.joinpath(name)
+            source = None if root is None else root.joinpath(name).as_posix()
+            tiles[x, y] = make_tile_loader(p_drd, Npts, fpasize, self.mmap,
+                                           layout=self.layout, exists=exists,
+                                           cache=self.tile_cache, bin=self.bin,
+                                           stats=self.stats,
+                                           source=source)
         self.tiles = tiles
+        self.present = present
+        _set_bin(self.info, self.bin)
+        self._tile_nbytes = 1020 + Npts * fpasize**2 * 4
+        self._tile_key = (p_in.stem, ".drd")
 
 
-class agilentMosaicIFG(agilentMosaicIFGTiles):
+class agilentMosaicIFG(_MosaicDataMixin, agilentMosaicIFGTiles):
     """
     Extracts the interferograms from an Agilent mosaic FPA image.
 
@@ -594,41 +2347,332 @@ class agilentMosaicIFG(agilentMosaicIFGTiles):
         filename (str):   full path to .dmt file
         MAT (bool):       Output array using image coordinates (matplotlib/MATLAB)
         dtype (np.dtype): Set dtype of output array (float32 or float64))
+        mmap (bool):      Memory-map tile files instead of reading them
+        workers (int):    Number of threads loading tiles concurrently (default: serial)
+        layout (str):     "bip" (height x width x points) or
+                          "bsq" (points x height x width, as stored on disk)
+        load_data (bool): Read the pixel data now, otherwise only on .load()
+        out (str):        Assemble into this ndarray, or a np.memmap created at this file name
+        max_memory (int): Assemble into a temporary np.memmap when .data would exceed
+                          this many bytes
+        scratch_dir (str): Directory for the max_memory temporary file
+        tile_cache (str): DiskTileCache (or its directory) of converted tiles to map from
+        tile_cache_max_bytes (int): Size cap of a tile_cache directory (default 16 GiB)
+        bin (int):        Block-average bin x bin pixels of each tile while loading
+        sparse (bool):    Keep only the tiles present in .tile_data instead of
+                          assembling .data; densify() builds .data on demand
+        stats:            True, or a hook function called with the LoadStats record, to
+                          collect per-phase timing in .stats ("memory": and peak memory)
+        index (DirectoryIndex): Existing index of the file's directory to reuse
 
     Attributes:
         info (dict):            Dictionary of acquisition information
         data (:obj:`ndarray`):  3-dimensional array (height x width x wavenumbers)
+        shape (tuple):          Shape of .data, available before loading
+        tiles (:obj:`ndarray`): (xtiles, ytiles) array of tile loaders
+        present (:obj:`ndarray`): (xtiles, ytiles) mask of tiles whose files exist
+        tile_data (dict):       {(x, y): tile} of the present tiles in sparse mode,
+                                oriented as iter_tiles() yields them
+        stats (LoadStats):      Timing and memory record, if requested (else None)
         filename (str):         Full path to .dmt file
     """
 
-    def __init__(self, filename, MAT=False, dtype=np.float32):
-        super().__init__(filename, MAT)
+    def __init__(self, filename, MAT=False, dtype=np.float32, mmap=False, workers=None,
+                 layout="bip", load_data=True, out=None, max_memory=None, scratch_dir=None,
+                 tile_cache=None, bin=1, sparse=False, stats=None, index=None,
+                 tile_cache_max_bytes=None):
+        super().__init__(filename, MAT=MAT, mmap=mmap, layout=layout, tile_cache=tile_cache,
+                         bin=bin, stats=stats, index=index,
+                         tile_cache_max_bytes=tile_cache_max_bytes)
+        self.sparse = sparse
+        # Always the whole mosaic
+        self.roi = None
         self.dtype = dtype
-        self._get_data()
-
-    def _get_data(self):
-        xtiles = self.tiles.shape[0]
-        ytiles = self.tiles.shape[1]
-        Npts = self.info['Npts']
+        self.workers = workers
+        self.out = out
+        self.max_memory = max_memory
+        self.scratch_dir = scratch_dir
         fpasize = self.info['fpasize']
-        # Allocate array
-        # (rows, columns, wavenumbers)
-        data = np.zeros((ytiles*fpasize, xtiles*fpasize, Npts),
-                        dtype=self.dtype)
-        if DEBUG:
-            print("self.tiles: ", self.tiles.shape)
-            print("self.data: ", data.shape)
+        self.shape = _image_shape(self.tiles.shape[1] * fpasize, self.tiles.shape[0] * fpasize,
+                                  self.info['Npts'], self.layout)
+        if load_data:
+            self._get_data()
+
+
+# Apodization functions of t = |distance from ZPD| / (longest arm), 1 at the ZPD
+_APODIZATION = {
+    "boxcar": lambda t: np.ones_like(t),
+    "triangular": lambda t: 1 - t,
+    "happ-genzel": lambda t: 0.54 + 0.46 * np.cos(np.pi * t),
+    "blackman-harris-3": lambda t: (0.42323 + 0.49755 * np.cos(np.pi * t)
+                                    + 0.07922 * np.cos(2 * np.pi * t)),
+    "blackman-harris-4": lambda t: (0.35875 + 0.48829 * np.cos(np.pi * t)
+                                    + 0.14128 * np.cos(2 * np.pi * t)
+                                    + 0.01168 * np.cos(3 * np.pi * t)),
+}
+
+
+class IFGTransform(object):
+    """
+    Interferogram to single-beam spectrum transform (Mertz phase correction)
 
-        for (x, y) in np.ndindex(self.tiles.shape):
-            tile = self.tiles[x, y]()
-            if self.MAT:
-                # Rotate and flip tile to match matplotlib/MATLAB image coordinates
-                tile = np.flipud(tile)
-                data[y*fpasize:(y+1)*fpasize, x*fpasize:(x+1)*fpasize, :] = tile
-            else:
-                # Tile data is in normal cartesian coordinates
-                # but tile numbering (000x_000y)
-                # is left-to-right, top-to-bottom (image coordinates)
-                data[(ytiles-y-1)*fpasize:(ytiles-y)*fpasize, (x)*fpasize:(x+1)*fpasize, :] = tile
+    Transforms a batch of interferograms along the last axis at once with numpy's FFT.
+    The double-sided part around the ZPD gives the phase; the full interferogram
+    is weighted by the Mertz ramp and the apodization, rotated to start at the ZPD,
+    zero-filled and transformed.
 
-        self.data = data
+    Args:
+        info (dict):            Interferogram info with 'PtSep' (cm), 'StartPt' and 'Npts'
+        apodization (str):      "blackman-harris-4", "blackman-harris-3", "happ-genzel",
+                                "triangular" or "boxcar"
+        zerofill (int):         FFT length as a multiple of the next power of two >= Npts
+        wavenumber_range (tuple): Only return wavenumbers within (lo, hi)
+        zpd (int):              Index of the zero path difference point
+                                (default: -StartPt, or the interferogram peak)
+
+    Attributes:
+        wavenumbers (:obj:`ndarray`): Wavenumbers (cm-1) of the output spectra
+        zpd (int):                    Index of the zero path difference point
+        size (int):                   FFT length
+    """
+
+    def __init__(self, info, apodization="blackman-harris-4", zerofill=1,
+                 wavenumber_range=None, zpd=None):
+        if apodization not in _APODIZATION:
+            raise ValueError("Unknown apodization: {}".format(apodization))
+        self.Npts = Npts = info['Npts']
+        self.zpd = zpd
+        if self.zpd is None and 0 < -info['StartPt'] < Npts:
+            self.zpd = -info['StartPt']
+        self.size = int(zerofill) * 2**int(np.ceil(np.log2(Npts)))
+        if self.size < Npts:
+            raise ValueError("zerofill must be at least 1")
+        self.apodization = apodization
+        wavenumbers = np.arange(self.size // 2 + 1) / (self.size * info['PtSep'])
+        self._keep = slice(None)
+        if wavenumber_range is not None:
+            bands = _resolve_bands(wavenumbers, wavenumber_range)
+            self._keep = slice(bands[0], bands[-1] + 1)
+        self.wavenumbers = wavenumbers[self._keep]
+        self._windows = {}
+
+    def _get_windows(self, zpd):
+        """
+        Returns the (phase, main) weights for an interferogram with its ZPD at :zpd:
+        """
+        if zpd not in self._windows:
+            d = np.arange(self.Npts) - zpd
+            # Double-sided half width and longest arm
+            short, longest = sorted((zpd, self.Npts - 1 - zpd))
+            if short < 1:
+                raise ValueError("ZPD {} leaves no double-sided interferogram".format(zpd))
+            sign = 1 if zpd <= self.Npts - 1 - zpd else -1
+            ramp = np.clip(0.5 * (1 + sign * d / short), 0, 1)
+            apod = _APODIZATION[self.apodization](np.clip(np.abs(d) / longest, 0, 1))
+            phase = np.clip(1 - np.abs(d) / short, 0, 1)
+            self._windows[zpd] = (phase, ramp * apod)
+        return self._windows[zpd]
+
+    def _rotated_fft(self, x, zpd):
+        # Move the ZPD to index 0, points before it wrap to the end
+        buf = np.zeros((x.shape[0], self.size))
+        buf[:, :self.Npts - zpd] = x[:, zpd:]
+        buf[:, self.size - zpd:] = x[:, :zpd]
+        return np.fft.rfft(buf)
+
+    def __call__(self, ifg):
+        """
+        Returns float32 spectra for interferograms :ifg: of shape (..., Npts)
+        """
+        ifg = np.asarray(ifg)
+        if ifg.shape[-1] != self.Npts:
+            raise ValueError("Expected {} interferogram points, got {}".format(
+                self.Npts, ifg.shape[-1]))
+        x = ifg.reshape(-1, self.Npts).astype(np.float64)
+        x -= x.mean(axis=1, keepdims=True)
+        zpd = self.zpd
+        if zpd is None:
+            zpd = int(np.argmax(np.abs(x).mean(axis=0)))
+        phase_w, main_w = self._get_windows(zpd)
+        phase = np.angle(self._rotated_fft(x * phase_w, zpd)[:, self._keep])
+        s = self._rotated_fft(x * main_w, zpd)[:, self._keep]
+        spectra = s.real * np.cos(phase) + s.imag * np.sin(phase)
+        return spectra.astype(np.float32).reshape(ifg.shape[:-1] + (-1,))
+
+
+def ifg_spectra(dataset, apodization="blackman-harris-4", zerofill=1, wavenumber_range=None,
+                zpd=None, prefetch=0):
+    """
+    Transform the interferograms of an IFG dataset to single-beam spectra
+
+    Mosaic tile objects (agilentMosaicIFGTiles, or agilentMosaicIFG with
+    load_data=False) are streamed tile by tile through iter_tiles(:prefetch:), so
+    only the spectral cube is held in memory. Loaded data is transformed in
+    batches of rows. See IFGTransform for the other arguments.
+
+    Returns:
+        (spectra, wavenumbers): spectral cube in the dataset's layout and orientation,
+                                and its wavenumber axis (cm-1)
+    """
+    transform = IFGTransform(dataset.info, apodization, zerofill, wavenumber_range, zpd)
+    bsq = dataset.layout == "bsq"
+    n = len(transform.wavenumbers)
+
+    def place(spectra, region, ifg):
+        # ifg is in the dataset layout, transform works on (rows, columns, points)
+        if bsq:
+            spectra[(slice(None),) + region] = np.moveaxis(
+                transform(np.moveaxis(ifg, 0, -1)), -1, 0)
+        else:
+            spectra[region] = transform(ifg)
+
+    tiles = getattr(dataset, 'tiles', None)
+    if tiles is not None and dataset.data.size == 0:
+        fpasize = dataset.info['fpasize']
+        shape = (tiles.shape[1] * fpasize, tiles.shape[0] * fpasize)
+        # Absent tiles are not read or transformed
+        spectra = np.full(_image_shape(*shape, n, dataset.layout), np.nan, dtype=np.float32)
+        with contextlib.closing(dataset.iter_tiles(prefetch, skip_missing=True)) as it:
+            for _, _, rows, cols, tile in it:
+                place(spectra, (rows, cols), tile)
+    else:
+        data = dataset.data if dataset.data.size else dataset.load()
+        shape = data.shape[1:] if bsq else data.shape[:2]
+        spectra = np.empty(_image_shape(*shape, n, dataset.layout), dtype=np.float32)
+        step = dataset.info.get('fpasize', shape[0])
+        for r in range(0, shape[0], step):
+            rows = slice(r, r + step)
+            place(spectra, (rows,), data[:, rows] if bsq else data[rows])
+    return spectra, transform.wavenumbers
+
+
+# Per-pixel reductions supported by quicklook()
+_REDUCTIONS = ("sum", "mean", "max", "min", "integral")
+
+def _trapezoid_weights(x):
+    """
+    Returns weights w with sum(w * y) the trapezoidal integral of y over :x:
+    """
+    w = np.zeros(len(x))
+    dx = np.diff(np.asarray(x, dtype=np.float64))
+    w[:-1] += dx / 2
+    w[1:] += dx / 2
+    return w
+
+def _streamed_roi(dataset):
+    """
+    Returns the (rows, columns) slices of the mosaic reader :dataset: to reduce:
+    its .roi, if any, else the whole mosaic
+    """
+    roi = getattr(dataset, 'roi', None)
+    if roi is not None:
+        return roi
+    fpasize = dataset.info['fpasize']
+    return (slice(0, dataset.tiles.shape[1] * fpasize),
+            slice(0, dataset.tiles.shape[0] * fpasize))
+
+def quicklook(dataset, reduction="sum", wavenumber_range=None, prefetch=0, **kwargs):
+    """
+    Returns a 2-D (height x width) image reducing each pixel's spectrum
+
+    Mosaic tile objects (agilentMosaicTiles, or the mosaic readers with
+    load_data=False) are reduced tile by tile as they are read, so memory is
+    proportional to one tile (plus :prefetch: read-ahead tiles). A file name is
+    opened as agilentMosaicTiles(filename, wavenumber_range=..., **kwargs), which
+    reads only the bands in :wavenumber_range:. Absent mosaic tiles are not
+    read and are NaN in the image. A mosaic opened with roi= is reduced over
+    that region only, reading just the tiles overlapping it.
+
+    Args:
+        dataset:                Reader object or .dmt file name
+        reduction (str):        "sum", "mean", "max", "min" or "integral"
+                                (trapezoidal, over the wavenumbers)
+        wavenumber_range (tuple): Only reduce wavenumbers within (lo, hi)
+        prefetch (int):         Tiles read ahead in background threads
+
+    Returns:
+        float64 image oriented as the dataset's .data
+    """
+    if reduction not in _REDUCTIONS:
+        raise ValueError("Unknown reduction: {}".format(reduction))
+    if isinstance(dataset, (str, os.PathLike)):
+        dataset = agilentMosaicTiles(dataset, wavenumber_range=wavenumber_range, **kwargs)
+        wavenumber_range = None
+    axis = 0 if dataset.layout == "bsq" else -1
+    window = slice(None)
+    weights = None
+    if wavenumber_range is not None or reduction == "integral":
+        if getattr(dataset, 'wavenumbers', None) is None:
+            raise ValueError("Dataset has no wavenumbers to select or integrate over")
+        wavenumbers = np.asarray(dataset.wavenumbers)
+        if wavenumber_range is not None:
+            bands = _resolve_bands(wavenumbers, wavenumber_range)
+            window = slice(bands[0], bands[-1] + 1)
+        weights = _trapezoid_weights(wavenumbers[window])
+
+    def reduce(a):
+        a = a[window] if axis == 0 else a[..., window]
+        if reduction == "integral":
+            return np.tensordot(weights, a, axes=(0, 0)) if axis == 0 else a @ weights
+        if reduction in ("sum", "mean"):
+            return getattr(a, reduction)(axis=axis, dtype=np.float64)
+        return getattr(a, reduction)(axis=axis).astype(np.float64)
+
+    tiles = getattr(dataset, 'tiles', None)
+    if tiles is not None and dataset.data.size == 0:
+        fpasize = dataset.info['fpasize']
+        roi = _streamed_roi(dataset)
+        # Absent tiles are not read, and are NaN in the image;
+        # tiles outside the roi are not read
+        image = np.full(tuple(r.stop - r.start for r in roi), np.nan)
+        coords = _roi_coords(tiles.shape, fpasize, dataset.MAT, roi)
+        with contextlib.closing(dataset.iter_tiles(prefetch, skip_missing=True,
+                                                   coords=coords)) as it:
+            for _, _, rows, cols, tile in it:
+                region, crop = _roi_overlap(rows, cols, roi)
+                image[region] = reduce(tile[(slice(None),) + crop if axis == 0 else crop])
+        return image
+    data = dataset.data if dataset.data.size else dataset.load()
+    return reduce(data)
+
+
+def open_dataset(filename, load_data=True, ifg=False, **kwargs):
+    """
+    Open any Agilent FPA file with the matching reader class
+
+    .dat -> agilentImage, .seq -> agilentImageIFG, .dmt -> agilentMosaic
+    (agilentMosaicIFG with ifg=True). A bare .bsp opens the .dat (or .seq with ifg=True),
+    and a mosaic's .dms file opens the mosaic like its .dmt.
+
+    Args:
+        filename (str):   full path to .dat, .seq, .bsp, .dmt or .dms file
+        load_data (bool): Read the pixel data now, otherwise only on .load()
+        ifg (bool):       Open the interferogram reader for .bsp / .dmt / .dms files
+        **kwargs:         Passed on to the reader class, e.g. index= to reuse one
+                          DirectoryIndex for the datasets of a directory
+
+    Returns:
+        Reader object with .info, .shape and .load() (and .data once loaded)
+    """
+    suffix = Path(filename).suffix.lower()
+    if suffix in (".dmt", ".dms"):
+        reader = agilentMosaicIFG if ifg else agilentMosaic
+    elif suffix == ".seq" or (suffix == ".bsp" and ifg):
+        reader = agilentImageIFG
+    elif suffix in (".dat", ".bsp"):
+        reader = agilentImage
+    else:
+        raise ValueError("Unknown Agilent file type: {}".format(filename))
+    return reader(filename, load_data=load_data, **kwargs)
+
+
+async def open_async(filename, executor=None, **kwargs):
+    """
+    Await open_dataset(filename, **kwargs) run in :executor: (default: the loop's executor)
+
+    Use with load_data=False and the tile classes' load_async() to keep
+    individual reads short.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor,
+                                      functools.partial(open_dataset, filename, **kwargs))
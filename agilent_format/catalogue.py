@@ -0,0 +1,273 @@
+"""
+Metadata catalogue of Agilent FPA datasets in a directory tree
+
+Only headers and directory listings are read, never pixel data. Records are
+cached in a SQLite file keyed by the (path, mtime, size) of the dataset and the
+(mtime, size) of its header file, so re-runs only parse
+new or changed acquisitions (including a rewritten .bsp header of an image).
+"""
+from concurrent.futures import ProcessPoolExecutor
+import csv
+import json
+import os
+from pathlib import Path
+import sqlite3
+
+from .agilent import DirectoryIndex, open_dataset
+
+# Columns of a catalogue record
+FIELDS = ['path', 'mtime', 'size', 'reader', 'Time Stamp', 'Npts', 'StartPt', 'PtSep',
+          'FPA Pixel Size', 'PixelAggregationSize', 'Resolution', 'Symmetry', 'fpasize',
+          'xtiles', 'ytiles', 'vis', 'error']
+
+# info keys copied into a record
+_INFO_FIELDS = ['Time Stamp', 'Npts', 'StartPt', 'PtSep', 'FPA Pixel Size',
+                'PixelAggregationSize', 'Resolution', 'Symmetry', 'fpasize']
+
+
+def find_datasets(root):
+    """
+    Walk :root: and yield (path, mtime, size) for every dataset found
+
+    Datasets are .dmt mosaics, and .dat/.seq images with a matching .bsp file.
+    """
+    for path, mtime, size, _, _ in _find_datasets(root):
+        yield path, mtime, size
+
+
+def _find_datasets(root):
+    """
+    find_datasets(), also yielding the DirectoryIndex of each dataset's directory,
+    built once per directory from the walk's own listing, and the (mtime, size) of
+    the dataset's header file (the .bsp of an image, the .dmt itself for a mosaic)
+    """
+    stack = [Path(root)]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            continue
+        by_name = {e.name.casefold(): e for e in entries}
+        index = None
+        subdirs = []
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(Path(entry.path))
+                    continue
+                stem, suffix = os.path.splitext(entry.name)
+                suffix = suffix.lower()
+                bsp = by_name.get((stem + ".bsp").casefold())
+                if suffix == ".dmt" or (suffix in (".dat", ".seq") and bsp is not None):
+                    if index is None:
+                        index = DirectoryIndex(directory, _file_names(entries))
+                    st = entry.stat()
+                    header = st if suffix == ".dmt" else bsp.stat()
+                    yield (Path(entry.path), st.st_mtime, st.st_size, index,
+                           (header.st_mtime, header.st_size))
+            except OSError:
+                continue
+        # Depth-first, in name order
+        stack.extend(reversed(subdirs))
+
+
+def _file_names(entries):
+    names = []
+    for entry in entries:
+        try:
+            if entry.is_file():
+                names.append(entry.name)
+        except OSError:
+            continue
+    return names
+
+
+def _open_metadata(path, index=None):
+    """
+    Open :path: with load_data=False, trying the interferogram readers as needed
+    """
+    suffix = path.suffix.lower()
+    try:
+        return open_dataset(path, load_data=False, index=index)
+    except FileNotFoundError:
+        # Mosaic with only .drd tiles
+        if suffix != ".dmt":
+            raise
+        return open_dataset(path, load_data=False, ifg=True, index=index)
+
+
+def catalogue_entry(path, mtime=None, size=None, index=None):
+    """
+    Returns the catalogue record (dict of FIELDS) of the dataset at :path:
+
+    :index: is an optional DirectoryIndex of the dataset's directory to reuse.
+    Exceptions are stored in the 'error' field instead of being raised.
+    """
+    path = Path(path)
+    if mtime is None or size is None:
+        st = path.stat()
+        mtime, size = st.st_mtime, st.st_size
+    record = dict.fromkeys(FIELDS)
+    record.update({'path': path.as_posix(), 'mtime': mtime, 'size': size})
+    try:
+        obj = _open_metadata(path, index)
+    except Exception as e:
+        record['error'] = "{}: {}".format(type(e).__name__, e)
+        return record
+    record['reader'] = type(obj).__name__
+    for k in _INFO_FIELDS:
+        record[k] = obj.info.get(k)
+    tiles = getattr(obj, 'tiles', None)
+    record['xtiles'], record['ytiles'] = (1, 1) if tiles is None else tiles.shape
+    record['vis'] = [dict(d, image_ref=Path(d['image_ref']).as_posix())
+                     for d in getattr(obj, 'vis', [])]
+    return record
+
+
+def _entries(task):
+    index, found = task
+    return [catalogue_entry(path, mtime, size, index) for path, mtime, size in found]
+
+
+def _tasks(args, chunksize):
+    """
+    Split :args: (path, mtime, size, index) into (index, [(path, mtime, size), ...])
+    worker tasks of up to :chunksize: datasets of one directory, so each index is
+    sent to a worker once per task
+    """
+    tasks = []
+    for a in args:
+        if not tasks or tasks[-1][0] is not a[3] or len(tasks[-1][1]) >= chunksize:
+            tasks.append((a[3], []))
+        tasks[-1][1].append(a[:3])
+    return tasks
+
+
+class CatalogueCache(object):
+    """
+    SQLite file of catalogue records keyed by the (path, mtime, size) of the dataset
+    and the (mtime, size) of its header file
+
+    Args:
+        filename (str): Cache file, created if it does not exist
+    """
+
+    _COLUMNS = ["path", "mtime", "size", "header_mtime", "header_size", "record"]
+
+    def __init__(self, filename):
+        self.db = sqlite3.connect(str(filename))
+        columns = [r[1] for r in self.db.execute("PRAGMA table_info(catalogue)")]
+        if columns and columns != self._COLUMNS:
+            # Written by an older version
+            self.db.execute("DROP TABLE catalogue")
+        self.db.execute("CREATE TABLE IF NOT EXISTS catalogue "
+                        "(path TEXT PRIMARY KEY, mtime REAL, size INTEGER, "
+                        "header_mtime REAL, header_size INTEGER, record TEXT)")
+
+    def get(self, path, mtime, size, header):
+        """
+        Returns the cached record for :path: if mtime and size, and the (mtime, size)
+        :header: of its header file, still match, else None
+        """
+        row = self.db.execute("SELECT record FROM catalogue WHERE path = ? AND mtime = ? "
+                              "AND size = ? AND header_mtime = ? AND header_size = ?",
+                              (Path(path).as_posix(), mtime, size) + tuple(header)).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def put(self, entries):
+        """
+        Store (record, header) :entries:, replacing older entries for the same paths
+        """
+        with self.db:
+            self.db.executemany("INSERT OR REPLACE INTO catalogue VALUES (?, ?, ?, ?, ?, ?)",
+                                ((r['path'], r['mtime'], r['size']) + tuple(header)
+                                 + (json.dumps(r),) for r, header in entries))
+
+    def close(self):
+        self.db.close()
+
+
+def build_catalogue(root, cache=None, workers=None, chunksize=16):
+    """
+    Returns a list of catalogue records for every dataset below :root:
+
+    Args:
+        root (str):      Directory tree to walk
+        cache (str):     Optional SQLite cache file; only new or changed datasets are parsed
+        workers (int):   Number of worker processes (default: os.cpu_count()),
+                         1 parses in this process
+        chunksize (int): Datasets sent to a worker at a time
+
+    Records which failed to parse have 'error' set, and are not cached so they are
+    retried on the next run. Each directory is listed once, and its index is shared
+    by all the datasets in it.
+    """
+    found = list(_find_datasets(root))
+    cache = CatalogueCache(cache) if cache is not None else None
+    try:
+        records = [None] * len(found)
+        todo = []
+        for i, (path, mtime, size, _, header) in enumerate(found):
+            record = cache.get(path, mtime, size, header) if cache is not None else None
+            if record is None:
+                todo.append(i)
+            records[i] = record
+
+        args = [found[i][:4] for i in todo]
+        if workers == 1 or len(args) <= 1:
+            parsed = [catalogue_entry(*a) for a in args]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                parsed = [r for chunk in executor.map(_entries, _tasks(args, chunksize))
+                          for r in chunk]
+        for i, record in zip(todo, parsed):
+            records[i] = record
+
+        if cache is not None:
+            cache.put((r, found[i][4]) for i, r in zip(todo, parsed) if r['error'] is None)
+    finally:
+        if cache is not None:
+            cache.close()
+    return records
+
+
+def _flat(record):
+    """
+    Record with the 'vis' list serialised to JSON, for tabular outputs
+    """
+    return dict(record, vis=json.dumps(record['vis']))
+
+
+def write_catalogue(records, filename):
+    """
+    Write :records: to :filename: as CSV (.csv), JSON Lines (.jsonl) or SQLite (.sqlite, .db)
+
+    The SQLite output is a "catalogue" table with one column per FIELDS entry.
+    """
+    filename = Path(filename)
+    suffix = filename.suffix.lower()
+    if suffix == ".csv":
+        with open(filename, 'w', newline='') as f:
+            writer = csv.DictWriter(f, FIELDS)
+            writer.writeheader()
+            writer.writerows(_flat(r) for r in records)
+    elif suffix == ".jsonl":
+        with open(filename, 'w') as f:
+            for r in records:
+                f.write(json.dumps(r) + "\n")
+    elif suffix in (".sqlite", ".db"):
+        columns = ", ".join('"{}"'.format(k) for k in FIELDS)
+        db = sqlite3.connect(str(filename))
+        try:
+            with db:
+                db.execute("DROP TABLE IF EXISTS catalogue")
+                db.execute("CREATE TABLE catalogue ({})".format(columns))
+                db.executemany("INSERT INTO catalogue VALUES ({})".format(
+                                   ", ".join("?" * len(FIELDS))),
+                               ([_flat(r)[k] for k in FIELDS] for r in records))
+        finally:
+            db.close()
+    else:
+        raise ValueError("Unknown catalogue format: {}".format(filename))
@@ -0,0 +1,169 @@
+"""
+Synthetic Agilent FPA datasets of any size, for benchmarks and tests
+
+Headers are written with just the properties the readers parse (the spectral
+axis at its fixed offset, PropType doubles, string properties, the Rapid
+Stingray section and the Interferogram axis), in the same record layout as
+Resolutions Pro files. Pixel data is seeded random float32 noise.
+"""
+from pathlib import Path
+import struct
+
+import numpy as np
+
+LASER_WAVENUMBER = 15798.0039
+UNDER_SAMPLING_RATIO = 4
+TIME_STAMP = "Tuesday, January 02, 2018 14:01:52"
+
+# Interferogram point separation (cm)
+IFG_PTSEP = UNDER_SAMPLING_RATIO / (2 * LASER_WAVENUMBER)
+
+# Rapid Stingray section entries. The parser reads the entry count from the
+# first non-control byte, and skips field length bytes only for some values,
+# so these keep the count (10) and every length parseable.
+_SECTION = [("User Stamp", "Synthetic"), ("Software Version", "5.3.0.1694"),
+            ("Aperture", "0"), ("Source Power", "MEDIUM"), ("Beam", "Left"),
+            ("Detector", "GND"), ("Filter", "NONE"), ("Signal", "AUTO"),
+            ("Sensitivity", "1")]
+
+# Planes written at a time, bounding memory for large tiles
+_CHUNK_PLANES = 64
+
+
+def _name(name):
+    b = name.encode('utf8')
+    return struct.pack("<i", len(b)) + b
+
+def _str_prop(name, value):
+    # The leading 4 also terminates the previous string value
+    k = name.encode('utf8')
+    b = str(value).encode('utf8')
+    n = len(b)
+    return (struct.pack("<3i", 4, len(k), len(k)) + k
+            + struct.pack("<11i", 4, 1, 4, 2, 4, 4, 4, n, 4, n, n) + b)
+
+def _double_prop(name, value):
+    return (_name(name) + struct.pack("<3i", 0, 2, 8) + b"PropType"
+            + struct.pack("<5i", 1, 1, 4, 0, 4) + b"1.00"
+            + struct.pack("<3id", 1, 1, 8, value))
+
+def _axis_prop(name, PtSep, StartPt, Npts):
+    return (_name(name) + struct.pack("<3i", 0, 3, 8) + b"PropType"
+            + struct.pack("<5i", 1, 1, 4, 7, 4) + b"Data" + struct.pack("<3i", 0, 1, 4)
+            + b"1.00" + struct.pack("<3idiiii", 1, 1, 8, PtSep, 4, StartPt, 4, Npts))
+
+def _section(name, items):
+    out = _name(name) + struct.pack("<4i", 4, 0, 4, len(items))
+    for k, v in items:
+        out += _str_prop(k, v)
+    return out + struct.pack("<i", 4)
+
+
+def make_header(Npts, StartPt, PtSep, ifg=None, fpa_pixel_size=5.5, aggregation=16,
+                resolution=None, symmetry="ASYM", time_stamp=TIME_STAMP):
+    """
+    Returns the bytes of a .bsp/.dmt header
+
+    Args:
+        Npts, StartPt, PtSep:  Spectral axis, wavenumbers = PtSep * (StartPt + i)
+        ifg (tuple):           Interferogram axis (PtSep, StartPt, Npts), if any
+        fpa_pixel_size (float): FPA Pixel Size (um)
+        aggregation (int):     PixelAggregationSize
+        resolution (int):      Resolution (cm-1), by default twice PtSep as in
+                               instrument files
+        symmetry (str):        Symmetry ("ASYM" or "SYM")
+        time_stamp (str):      Time Stamp of the Rapid Stingray section
+    """
+    if resolution is None:
+        resolution = max(1, round(2 * PtSep))
+    dat = bytearray(2240)
+    # Spectral axis at its fixed offsets, inside a PropType value block
+    dat[2200:2240] = b"1.00" + struct.pack("<3idiiii", 1, 4, 8, PtSep, 4, StartPt, 4, Npts)
+    dat += _section("Rapid Stingray", [("Time Stamp", time_stamp)] + _SECTION)
+    dat += _str_prop("PixelAggregationSize", aggregation)
+    dat += _str_prop("Resolution", resolution)
+    dat += _str_prop("Under Sampling Ratio", UNDER_SAMPLING_RATIO)
+    dat += _str_prop("Effective Laser Wavenumber", LASER_WAVENUMBER)
+    dat += _str_prop("Symmetry", symmetry)
+    dat += _double_prop("Visible Pixel Size", 1.0929)
+    dat += _double_prop("FPA Pixel Size", fpa_pixel_size)
+    if ifg is not None:
+        dat += _axis_prop("Interferogram", *ifg)
+    return bytes(dat + bytes(16))
+
+def axes(npts, start_pt=64, ifg_npts=None):
+    """
+    Returns the consistent spectral (PtSep, StartPt, Npts) and interferogram
+    (PtSep, StartPt, Npts) axes of a dataset
+
+    The interferogram (default length covering the spectral range) has its
+    ZPD an eighth of the way in, and is transformed with the next power of two
+    points, which sets the spectral point separation.
+    """
+    if ifg_npts is None:
+        ifg_npts = 2 * (start_pt + npts)
+    size = 1 << (ifg_npts - 1).bit_length()
+    if start_pt + npts > size // 2 + 1:
+        raise ValueError("{} interferogram points do not cover {} spectral points "
+                         "from {}".format(ifg_npts, npts, start_pt))
+    return ((1 / (size * IFG_PTSEP), start_pt, npts),
+            (IFG_PTSEP, -(ifg_npts // 8), ifg_npts))
+
+def write_tile(path, Npts, fpa, rng):
+    """
+    Write a .dat/.seq/.dmd/.drd tile of (Npts, fpa, fpa) random float32 data
+    """
+    with open(path, 'wb') as f:
+        # 255 block preamble
+        f.write(bytes(255*4))
+        for start in range(0, Npts, _CHUNK_PLANES):
+            n = min(_CHUNK_PLANES, Npts - start)
+            rng.random((n, fpa, fpa), dtype=np.float32).tofile(f)
+
+def write_image(directory, stem="synthetic", fpa=64, npts=100, start_pt=64, ifg_npts=None,
+                ifg=True, seed=0, **kwargs):
+    """
+    Write a single tile image: <stem>.bsp, <stem>.dat and (with :ifg:) <stem>.seq
+
+    :kwargs: are passed on to make_header().
+
+    Returns:
+        Path of the .dat file
+    """
+    directory = Path(directory)
+    spectral, interferogram = axes(npts, start_pt, ifg_npts)
+    PtSep, StartPt, Npts = spectral
+    kwargs.setdefault('aggregation', 16)
+    directory.joinpath(stem + ".bsp").write_bytes(
+        make_header(Npts, StartPt, PtSep, interferogram if ifg else None, **kwargs))
+    rng = np.random.default_rng(seed)
+    write_tile(directory.joinpath(stem + ".dat"), Npts, fpa, rng)
+    if ifg:
+        write_tile(directory.joinpath(stem + ".seq"), interferogram[2], fpa, rng)
+    return directory.joinpath(stem + ".dat")
+
+def write_mosaic(directory, stem="synthetic", fpa=64, npts=100, tiles=(2, 2), start_pt=64,
+                 ifg_npts=None, ifg=True, seed=0, **kwargs):
+    """
+    Write a mosaic: <stem>.dmt, <stem>_XXXX_YYYY.dmd and (with :ifg:) .drd tiles
+    for a (xtiles, ytiles) grid of :tiles:
+
+    :kwargs: are passed on to make_header().
+
+    Returns:
+        Path of the .dmt file
+    """
+    directory = Path(directory)
+    spectral, interferogram = axes(npts, start_pt, ifg_npts)
+    PtSep, StartPt, Npts = spectral
+    kwargs.setdefault('aggregation', 32)
+    dmt = directory.joinpath(stem + ".dmt")
+    dmt.write_bytes(make_header(Npts, StartPt, PtSep, interferogram if ifg else None,
+                                **kwargs))
+    rng = np.random.default_rng(seed)
+    for (x, y) in np.ndindex(*tiles):
+        name = stem + "_{0:04d}_{1:04d}".format(x, y)
+        write_tile(directory.joinpath(name + ".dmd"), Npts, fpa, rng)
+        if ifg:
+            write_tile(directory.joinpath(name + ".drd"), interferogram[2], fpa, rng)
+    return dmt
@@ -0,0 +1,64 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from agilent_format import (open_async, agilentImage, agilentMosaic, agilentMosaicTiles,
+                            agilentMosaicIFGTiles)
+
+DAT = Path(__file__).parent.parent.joinpath("datasets/4_noimage_agg256.dat")
+DMT = Path(__file__).parent.parent.joinpath("datasets/5_mosaic_agg1024.dmt")
+
+
+class TestAsync(unittest.TestCase):
+
+    def test_open_async(self):
+        ai = asyncio.run(open_async(DAT, MAT=True))
+        self.assertIsInstance(ai, agilentImage)
+        np.testing.assert_equal(ai.data, agilentImage(DAT, MAT=True).data)
+        with ThreadPoolExecutor(1) as executor:
+            ai = asyncio.run(open_async(DMT, executor=executor, load_data=False))
+        self.assertIsInstance(ai, agilentMosaic)
+        self.assertEqual(ai.data.size, 0)
+
+    def test_load_async(self):
+        for reader in (agilentMosaicTiles, agilentMosaicIFGTiles):
+            t = reader(DMT)
+            tile = asyncio.run(t.load_async(0, 1))
+            np.testing.assert_equal(tile, t.tiles[0, 1]())
+            tiles = asyncio.run(t.load_tiles_async())
+            self.assertEqual(len(tiles), 2)
+            np.testing.assert_equal(tiles[0], t.tiles[0, 0]())
+            tiles = asyncio.run(t.load_tiles_async([(0, 1), (0, 0), (0, 1)], limit=2))
+            np.testing.assert_equal(tiles[2], t.tiles[0, 1]())
+
+    def test_concurrency_limit(self):
+        t = agilentMosaicTiles(DMT)
+        lock = threading.Lock()
+        active = []
+        peak = []
+        for (x, y) in np.ndindex(t.tiles.shape):
+            def slow(f=t.tiles[x, y]):
+                with lock:
+                    active.append(1)
+                    peak.append(len(active))
+                time.sleep(0.02)
+                with lock:
+                    active.pop()
+                return f()
+            t.tiles[x, y] = slow
+        coords = [(0, 0), (0, 1)] * 4
+        with ThreadPoolExecutor(8) as executor:
+            asyncio.run(t.load_tiles_async(coords, limit=2, executor=executor))
+            self.assertLessEqual(max(peak), 2)
+            peak.clear()
+            asyncio.run(t.load_tiles_async(coords, executor=executor))
+            self.assertGreater(max(peak), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
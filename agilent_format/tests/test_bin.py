@@ -0,0 +1,62 @@
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from agilent_format import (agilentImage, agilentMosaic, agilentMosaicIFG,
+                            agilentMosaicTiles, quicklook)
+
+DAT = Path(__file__).parent.parent.joinpath("datasets/4_noimage_agg256.dat")
+DMT = Path(__file__).parent.parent.joinpath("datasets/5_mosaic_agg1024.dmt")
+
+
+def block_mean(data, b, layout="bip"):
+    if layout == "bsq":
+        n, r, c = data.shape
+        return data.reshape(n, r // b, b, c // b, b).mean(axis=(2, 4))
+    r, c, n = data.shape
+    return data.reshape(r // b, b, c // b, b, n).mean(axis=(1, 3))
+
+
+class TestBin(unittest.TestCase):
+
+    def test_mosaic(self):
+        for reader in (agilentMosaic, agilentMosaicIFG):
+            for MAT in (False, True):
+                for layout in ("bip", "bsq"):
+                    full = reader(DMT, MAT=MAT, layout=layout)
+                    for workers in (None, 2):
+                        binned = reader(DMT, MAT=MAT, layout=layout, bin=2, workers=workers)
+                        np.testing.assert_allclose(binned.data,
+                                                   block_mean(full.data, 2, layout), rtol=1e-6)
+        ai = agilentMosaic(DMT, bin=4)
+        self.assertEqual(ai.data.shape, (2, 1, 9))
+        self.assertEqual((ai.height, ai.width, ai.info['fpasize']), (2, 1, 1))
+        self.assertEqual(ai.info['Effective Pixel Size'], 5.5 * 32 * 4)
+        with self.assertRaises(ValueError):
+            agilentMosaic(DMT, bin=3)
+
+    def test_mosaic_roi(self):
+        full = block_mean(agilentMosaic(DMT, MAT=True).data, 2)
+        ai = agilentMosaic(DMT, MAT=True, bin=2, roi=((1, 3), None))
+        np.testing.assert_allclose(ai.data, full[1:3], rtol=1e-6)
+        px = 5.5 * 32 * 2
+        ai = agilentMosaic(DMT, MAT=True, bin=2, roi=((0, 2 * px), None), roi_units="um")
+        np.testing.assert_allclose(ai.data, full[2:4], rtol=1e-6)
+
+    def test_image(self):
+        for MAT in (False, True):
+            full = agilentImage(DAT, MAT=MAT)
+            binned = agilentImage(DAT, MAT=MAT, bin=2)
+            self.assertEqual((binned.width, binned.height), (4, 4))
+            np.testing.assert_allclose(binned.data, block_mean(full.data, 2), rtol=1e-6)
+            self.assertEqual(binned.info['Effective Pixel Size'], 5.5 * 16 * 2)
+
+    def test_streaming(self):
+        tiles = agilentMosaicTiles(DMT, MAT=True, bin=2)
+        full = block_mean(agilentMosaic(DMT, MAT=True).data, 2)
+        np.testing.assert_allclose(quicklook(tiles), full.sum(axis=2), rtol=1e-6)
+
+
+if __name__ == '__main__':
+    unittest.main()
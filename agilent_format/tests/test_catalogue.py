@@ -0,0 +1,135 @@
+import csv
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from agilent_format import catalogue
+
+DATASETS = Path(__file__).parent.parent.joinpath("datasets")
+
+
+class TestCatalogue(unittest.TestCase):
+
+    def setUp(self):
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self._temp_dir.name)
+        mosaic = self.root.joinpath("run1", "mosaic")
+        images = self.root.joinpath("run2")
+        for d in (mosaic, images):
+            d.mkdir(parents=True)
+        for f in DATASETS.iterdir():
+            dest = mosaic if f.name.lower().startswith("5_mosaic") or "Mosaic" in f.name \
+                or f.suffix == ".bmp" else images
+            shutil.copyfile(f, dest.joinpath(f.name))
+
+    def tearDown(self):
+        self._temp_dir.cleanup()
+
+    def test_find_datasets(self):
+        found = [p.relative_to(self.root).as_posix()
+                 for p, _, _ in catalogue.find_datasets(self.root)]
+        # 5_Mosaic_agg1024.dat has no .bsp and is not a dataset
+        self.assertEqual(found, ["run1/mosaic/5_mosaic_agg1024.dmt",
+                                 "run2/4_noimage_agg256.dat",
+                                 "run2/4_noimage_agg256.seq",
+                                 "run2/background_agg1024.dat",
+                                 "run2/background_agg1024.seq",
+                                 "run2/background_agg256.dat",
+                                 "run2/background_agg256.seq"])
+
+    def test_entries(self):
+        records = catalogue.build_catalogue(self.root, workers=1)
+        self.assertEqual(len(records), 7)
+        mosaic = records[0]
+        self.assertEqual(list(mosaic), catalogue.FIELDS)
+        self.assertIsNone(mosaic['error'])
+        self.assertEqual(mosaic['reader'], "agilentMosaic")
+        self.assertEqual((mosaic['xtiles'], mosaic['ytiles']), (1, 2))
+        self.assertEqual((mosaic['Npts'], mosaic['fpasize']), (9, 4))
+        self.assertEqual(mosaic['PixelAggregationSize'], 32)
+        self.assertEqual(len(mosaic['vis']), 2)
+        seq = records[2]
+        self.assertEqual(seq['reader'], "agilentImageIFG")
+        self.assertEqual(seq['Time Stamp'], "Tuesday, January 02, 2018 14:01:52")
+        self.assertEqual((seq['xtiles'], seq['ytiles'], seq['Npts']), (1, 1, 311))
+
+    def test_errors_not_fatal(self):
+        self.root.joinpath("run2", "4_noimage_agg256.bsp").write_bytes(bytes(16))
+        records = catalogue.build_catalogue(self.root, workers=1)
+        self.assertEqual(len(records), 7)
+        self.assertIsNotNone(records[1]['error'])
+        self.assertIsNotNone(records[2]['error'])
+        self.assertIsNone(records[3]['error'])
+
+    def test_cache(self):
+        cache = self.root.joinpath("cache.sqlite")
+        first = catalogue.build_catalogue(self.root, cache=cache, workers=1)
+        with mock.patch.object(catalogue, "catalogue_entry",
+                               side_effect=catalogue.catalogue_entry) as entry:
+            second = catalogue.build_catalogue(self.root, cache=cache, workers=1)
+            self.assertEqual(entry.call_count, 0)
+            self.assertEqual(second, json.loads(json.dumps(first)))
+            # A rewritten .bsp header re-parses the .dat and .seq using it
+            bsp = self.root.joinpath("run2", "4_noimage_agg256.bsp")
+            st = bsp.stat()
+            os.utime(bsp, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+            records = catalogue.build_catalogue(self.root, cache=cache, workers=1)
+            self.assertEqual(entry.call_count, 2)
+            self.assertEqual(records, second)
+            # Changed size re-parses only that dataset
+            with open(self.root.joinpath("run2", "background_agg256.seq"), 'ab') as f:
+                f.write(b"\0")
+            catalogue.build_catalogue(self.root, cache=cache, workers=1)
+            self.assertEqual(entry.call_count, 3)
+
+    def test_old_cache(self):
+        cache = self.root.joinpath("cache.sqlite")
+        db = sqlite3.connect(str(cache))
+        db.execute("CREATE TABLE catalogue "
+                   "(path TEXT PRIMARY KEY, mtime REAL, size INTEGER, record TEXT)")
+        db.commit()
+        db.close()
+        records = catalogue.build_catalogue(self.root, cache=cache, workers=1)
+        self.assertEqual(records, catalogue.build_catalogue(self.root, cache=cache, workers=1))
+
+    def test_one_scan_per_directory(self):
+        with mock.patch("os.scandir", side_effect=os.scandir) as scandir:
+            records = catalogue.build_catalogue(self.root, workers=1)
+        self.assertTrue(all(r['error'] is None for r in records))
+        # root, run1, run1/mosaic and run2
+        self.assertEqual(scandir.call_count, 4)
+
+    def test_process_pool(self):
+        serial = catalogue.build_catalogue(self.root, workers=1)
+        parallel = catalogue.build_catalogue(self.root, workers=2, chunksize=2)
+        self.assertEqual(parallel, serial)
+
+    def test_write(self):
+        records = catalogue.build_catalogue(self.root, workers=1)
+        out = self.root.joinpath("cat.csv")
+        catalogue.write_catalogue(records, out)
+        with open(out, newline='') as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(len(rows), 7)
+        self.assertEqual(len(json.loads(rows[0]['vis'])), 2)
+        out = self.root.joinpath("cat.jsonl")
+        catalogue.write_catalogue(records, out)
+        self.assertEqual([json.loads(line) for line in out.read_text().splitlines()],
+                         records)
+        out = self.root.joinpath("cat.sqlite")
+        catalogue.write_catalogue(records, out)
+        db = sqlite3.connect(str(out))
+        rows = db.execute('SELECT path, "Npts" FROM catalogue').fetchall()
+        db.close()
+        self.assertEqual([r[1] for r in rows], [r['Npts'] for r in records])
+        with self.assertRaises(ValueError):
+            catalogue.write_catalogue(records, self.root.joinpath("cat.xml"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -19,6 +19,32 @@ class TestFilenames(unittest.TestCase):
         for fn in filenames:
             p.joinpath(p, fn).touch()
 
+    def test_directory_index(self):
+        filenames = ["ab9.dmt",
+                     "AB9.bsp",
+                     "AB9_0000_0000.dmd",
+                     "ab9_0001_0000.DMD",
+                     "AB9_0000_0001.dmd",
+                     "AB9_0000_0000.drd",
+                     ]
+        self.add_files_to_dir(filenames)
+        self._temp_path.joinpath("AB9_0000_0001.dmd").write_bytes(bytes(8))
+        index = agilent_format.DirectoryIndex(self._temp_path)
+        self.assertEqual(index.name("AB9.DMT"), "ab9.dmt")
+        self.assertEqual(index.find("ab9.bsp"), self._temp_path.joinpath("AB9.bsp"))
+        self.assertIsNone(index.find("ab9.seq"))
+        self.assertEqual(index.size("ab9_0000_0001.dmd"), 8)
+        self.assertEqual(index.tiles("AB9", ".dmd"),
+                         {(0, 0): "AB9_0000_0000.dmd",
+                          (1, 0): "ab9_0001_0000.DMD",
+                          (0, 1): "AB9_0000_0001.dmd"})
+        self.assertEqual(index.tile_counts("AB9", ".dmd"), (2, 2))
+        self.assertEqual(index.tile_counts("AB9", ".drd"), (1, 1))
+        self.assertEqual(index.check_tiles("AB9", ".dmd", (2, 2), 4),
+                         {'missing': [(1, 1)], 'short': [(0, 0), (1, 0)]})
+        dmt = self._temp_path.joinpath(filenames[0])
+        self.assertEqual(agilent_format.check_files(dmt, ['.dmt', '.dmd'], index).name, "AB9")
+
     def test_dmt_DMD(self):
         filenames = ["ab9.dmt",
                      "AB9.bsp",
@@ -0,0 +1,44 @@
+import unittest
+from pathlib import Path
+
+from agilent_format import agilent, agilentHeader
+
+BSP = Path(__file__).parent.parent.joinpath("datasets/4_noimage_agg256.bsp")
+DMT = Path(__file__).parent.parent.joinpath("datasets/5_mosaic_agg1024.dmt")
+
+
+class TestHeader(unittest.TestCase):
+
+    def test_params(self):
+        h = agilentHeader.from_path(BSP)
+        d = agilent._get_params(h)
+        self.assertEqual(d['Visible Pixel Size'], 0.508)
+        self.assertEqual(d['FPA Pixel Size'], 5.5)
+        self.assertEqual(d['Time Stamp'], "Tuesday, January 02, 2018 14:01:52")
+        self.assertEqual(d['PixelAggregationSize'], 16)
+        self.assertEqual(d['Resolution'], 32)
+        self.assertEqual(d['Under Sampling Ratio'], 4)
+        self.assertEqual(d['Effective Laser Wavenumber'], 15798.0039)
+        self.assertEqual(d['Symmetry'], "ASYM")
+        self.assertEqual(agilent._get_ifg_params(h),
+                         {'PtSep': 0.00012659827227975054, 'StartPt': -68, 'Npts': 311})
+        self.assertEqual(agilent._get_wavenumbers(h)['Npts'], 9)
+
+    def test_file_handle(self):
+        """Parsers still accept an open file handle"""
+        h = agilentHeader.from_path(DMT)
+        with DMT.open(mode='rb') as f:
+            self.assertEqual(agilent._get_params(f), agilent._get_params(h))
+            self.assertEqual(agilent._get_ifg_params(f), agilent._get_ifg_params(h))
+            self.assertEqual(agilent._get_wavenumbers(f), agilent._get_wavenumbers(h))
+
+    def test_other_properties(self):
+        h = agilentHeader.from_path(BSP)
+        self.assertIn('Scans', h)
+        self.assertEqual(h.get_str('Scans'), '4')
+        self.assertNotIn('Not A Property', h)
+        self.assertEqual(h.get_str('Not A Property'), '')
+        with self.assertRaises(KeyError):
+            h.get_double('Not A Property')
+        with self.assertRaises(IndexError):
+            h.get_section('Not A Section')
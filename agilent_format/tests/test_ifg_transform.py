@@ -0,0 +1,80 @@
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from agilent_format import (IFGTransform, ifg_spectra, agilentImage, agilentImageIFG,
+                            agilentMosaicIFG, agilentMosaicIFGTiles)
+
+DATASETS = Path(__file__).parent.parent.joinpath("datasets")
+SEQ = DATASETS.joinpath("background_agg256.seq")
+DAT = DATASETS.joinpath("background_agg256.dat")
+DMT = DATASETS.joinpath("5_mosaic_agg1024.dmt")
+
+
+class TestIFGTransform(unittest.TestCase):
+
+    def test_wavenumber_axis(self):
+        aifg = agilentImageIFG(SEQ)
+        t = IFGTransform(aifg.info)
+        self.assertEqual(t.size, 512)
+        self.assertEqual(t.zpd, 68)
+        ai = agilentImage(DAT)
+        # Instrument spectra are points StartPt... of the same axis
+        start = ai.info['StartPt']
+        np.testing.assert_allclose(t.wavenumbers[start:start + ai.info['Npts']],
+                                   ai.wavenumbers)
+        self.assertEqual(len(IFGTransform(aifg.info, zerofill=2).wavenumbers), 513)
+
+    def test_matches_instrument(self):
+        """Single-beam background matches the instrument's up to scale"""
+        ai = agilentImage(DAT)
+        wn_range = (ai.wavenumbers[0] - 1, ai.wavenumbers[-1] + 1)
+        for MAT in (False, True):
+            spectra, wn = ifg_spectra(agilentImageIFG(SEQ, MAT=MAT), wavenumber_range=wn_range)
+            np.testing.assert_allclose(wn, ai.wavenumbers)
+            ratio = agilentImage(DAT, MAT=MAT).data / spectra
+            self.assertLess(ratio.std() / ratio.mean(), 1e-3)
+
+    def test_batches(self):
+        aifg = agilentImageIFG(SEQ)
+        t = IFGTransform(aifg.info, apodization="happ-genzel")
+        batch = t(aifg.data)
+        self.assertEqual(batch.shape, (8, 8, 257))
+        self.assertEqual(batch.dtype, np.float32)
+        np.testing.assert_allclose(t(aifg.data[3, 5]), batch[3, 5], rtol=1e-5)
+        with self.assertRaises(ValueError):
+            t(aifg.data[..., 1:])
+        with self.assertRaises(ValueError):
+            IFGTransform(aifg.info, apodization="hanning")
+
+    def test_zpd_peak(self):
+        aifg = agilentImageIFG(SEQ)
+        info = dict(aifg.info, StartPt=0)
+        spectra = IFGTransform(info)(aifg.data)
+        # Mertz phase correction absorbs the one point ZPD offset
+        ref = IFGTransform(aifg.info)(aifg.data)
+        ratio = spectra[..., 129:138] / ref[..., 129:138]
+        self.assertLess(ratio.std() / ratio.mean(), 1e-3)
+
+    def test_mosaic_streaming(self):
+        for MAT in (False, True):
+            for layout in ("bip", "bsq"):
+                loaded = agilentMosaicIFG(DMT, MAT=MAT, layout=layout)
+                ref, wn = ifg_spectra(loaded, wavenumber_range=(1900, 2200))
+                for dataset in (agilentMosaicIFGTiles(DMT, MAT=MAT, layout=layout),
+                                agilentMosaicIFG(DMT, MAT=MAT, layout=layout,
+                                                 load_data=False)):
+                    spectra, wn_s = ifg_spectra(dataset, wavenumber_range=(1900, 2200),
+                                                prefetch=1)
+                    np.testing.assert_equal(spectra, ref)
+                    np.testing.assert_equal(wn_s, wn)
+                self.assertEqual(ref.shape, (len(wn), 8, 4) if layout == "bsq"
+                                 else (8, 4, len(wn)))
+            # Same as transforming the assembled interferogram cube
+            bip = agilentMosaicIFG(DMT, MAT=MAT)
+            np.testing.assert_allclose(ifg_spectra(bip)[0], IFGTransform(bip.info)(bip.data))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,8 @@
 import unittest
 from pathlib import Path
 
+import numpy as np
+
 from agilent_format import agilentImage
 
 DAT = Path(__file__).parent.parent.joinpath("datasets/4_noimage_agg256.dat")
@@ -34,4 +36,35 @@ class TestImage(unittest.TestCase):
         # Confirm image orientation
         self.assertAlmostEqual(ai.data[7, 1, 1], 1.27181053)
         self.assertAlmostEqual(ai.data[7, 2, 2], 1.27506005)
-        self.assertAlmostEqual(ai.data[6, 2, 3], 0.30882764)
\ No newline at end of file
+        self.assertAlmostEqual(ai.data[6, 2, 3], 0.30882764)
+
+    def test_load_image_mmap(self):
+        ai = agilentImage(DAT, MAT=False)
+        ai_mm = agilentImage(DAT, MAT=False, mmap=True)
+        self.assertIsInstance(ai_mm.data, np.memmap)
+        np.testing.assert_array_equal(ai_mm.data, ai.data)
+        ai_mm = agilentImage(DAT, MAT=True, mmap=True)
+        self.assertAlmostEqual(ai_mm.data[7, 1, 1], 1.27181053)
+
+    def test_load_image_wavenumber_range(self):
+        ai = agilentImage(DAT, MAT=False)
+        wn = ai.wavenumbers
+        for mmap in (False, True):
+            ai_r = agilentImage(DAT, MAT=False, mmap=mmap,
+                                wavenumber_range=(wn[5], wn[2]))
+            self.assertEqual(ai_r.wavenumbers, wn[2:6])
+            self.assertEqual(ai_r.info['Npts'], 4)
+            self.assertEqual(ai_r.wavenumbers[0], ai_r.info['StartPt'] * ai_r.info['PtSep'])
+            np.testing.assert_array_equal(ai_r.data, ai.data[:, :, 2:6])
+
+    def test_load_image_bands(self):
+        ai = agilentImage(DAT, MAT=True)
+        for mmap in (False, True):
+            ai_b = agilentImage(DAT, MAT=True, mmap=mmap, bands=[7, 0, 1, -1])
+            self.assertEqual(ai_b.info['bands'], [0, 1, 7, 8])
+            self.assertEqual(ai_b.wavenumbers, [ai.wavenumbers[i] for i in [0, 1, 7, 8]])
+            np.testing.assert_array_equal(ai_b.data, ai.data[:, :, [0, 1, 7, 8]])
+        with self.assertRaises(IndexError):
+            agilentImage(DAT, bands=[9])
+        with self.assertRaises(ValueError):
+            agilentImage(DAT, wavenumber_range=(0, 1))
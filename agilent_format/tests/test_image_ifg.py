@@ -41,6 +41,12 @@ class TestImageIFG(unittest.TestCase):
         self.assertAlmostEqual(aifg.data[1, 1, 0], 0.97700727)
         self.assertAlmostEqual(aifg.data[2, 2, 0], 1.0310643)
 
+    def test_load_ifg_sample_mmap(self):
+        aifg = agilentImageIFG(SEQ, MAT=False, mmap=True)
+        self.shared_info(aifg)
+        self.assertAlmostEqual(aifg.data[1, 1, 0], 0.64558595)
+        self.assertAlmostEqual(aifg.data[2, 2, 0], 0.5792696)
+
     def test_ifg_processed_wn(self):
         aifg = agilentImageIFG(SEQ, MAT=False)
         wn_ifg = aifg.info['wavenumbers']
@@ -0,0 +1,108 @@
+import threading
+import time
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from agilent_format import (agilentMosaic, agilentMosaicTiles,
+                            agilentMosaicIFG, agilentMosaicIFGTiles, TilePrefetcher)
+
+DMT = Path(__file__).parent.parent.joinpath("datasets/5_mosaic_agg1024.dmt")
+
+
+class TestIterTiles(unittest.TestCase):
+
+    def assemble(self, tiles, shape):
+        data = np.full(shape, np.nan, dtype=np.float32)
+        seen = []
+        for x, y, rows, cols, tile in tiles.iter_tiles():
+            seen.append((x, y))
+            if tiles.layout == "bsq":
+                data[:, rows, cols] = tile
+            else:
+                data[rows, cols] = tile
+        self.assertEqual(seen, [(0, 0), (0, 1)])
+        return data
+
+    def test_matches_mosaic(self):
+        for MAT in (False, True):
+            for layout in ("bip", "bsq"):
+                full = agilentMosaic(DMT, MAT=MAT, layout=layout)
+                lazy = agilentMosaic(DMT, MAT=MAT, layout=layout, load_data=False)
+                np.testing.assert_equal(self.assemble(lazy, full.data.shape), full.data)
+                ifg = agilentMosaicIFG(DMT, MAT=MAT, layout=layout)
+                lazy = agilentMosaicIFG(DMT, MAT=MAT, layout=layout, load_data=False)
+                np.testing.assert_equal(self.assemble(lazy, ifg.data.shape), ifg.data)
+
+    def test_tiles_classes(self):
+        for MAT in (False, True):
+            full = agilentMosaic(DMT, MAT=MAT, bands=[1, 4])
+            np.testing.assert_equal(
+                self.assemble(agilentMosaicTiles(DMT, MAT=MAT, bands=[1, 4]), full.data.shape),
+                full.data)
+            full = agilentMosaicIFG(DMT, MAT=MAT)
+            np.testing.assert_equal(
+                self.assemble(agilentMosaicIFGTiles(DMT, MAT=MAT), full.data.shape), full.data)
+
+    def test_lazy(self):
+        tiles = agilentMosaicTiles(DMT)
+        calls = []
+        for (x, y) in np.ndindex(tiles.tiles.shape):
+            def counted(f=tiles.tiles[x, y], xy=(x, y)):
+                calls.append(xy)
+                return f()
+            tiles.tiles[x, y] = counted
+        it = tiles.iter_tiles()
+        self.assertEqual(calls, [])
+        next(it)
+        self.assertEqual(calls, [(0, 0)])
+
+    def test_prefetch_matches(self):
+        for MAT in (False, True):
+            t = agilentMosaicTiles(DMT, MAT=MAT)
+            with t.iter_tiles(prefetch=2) as it:
+                self.assertIsInstance(it, TilePrefetcher)
+                prefetched = list(it)
+            for a, b in zip(prefetched, t.iter_tiles()):
+                self.assertEqual(a[:4], b[:4])
+                np.testing.assert_equal(a[4], b[4])
+            self.assertEqual(len(prefetched), 2)
+
+    def test_prefetch_depth_and_stalls(self):
+        t = agilentMosaicTiles(DMT)
+        lock = threading.Lock()
+        started = []
+        f0 = t.tiles[0, 0]
+        # 4 x 5 grid of copies of tile (0, 0)
+        t.tiles = np.empty((4, 5), dtype=object)
+        for (x, y) in np.ndindex(t.tiles.shape):
+            def slow(xy=(x, y)):
+                with lock:
+                    started.append(xy)
+                time.sleep(0.01)
+                return f0()
+            t.tiles[x, y] = slow
+        it = t.iter_tiles(prefetch=3)
+        consumed = 0
+        for _ in it:
+            consumed += 1
+            time.sleep(0.001)
+            with lock:
+                # Only :depth: tiles are read ahead of the consumer
+                self.assertLessEqual(len(started) - consumed, 3)
+        self.assertEqual(consumed, 20)
+        self.assertGreater(it.stalls, 0)
+        self.assertGreater(it.stall_time, 0)
+
+    def test_prefetch_close(self):
+        t = agilentMosaicTiles(DMT)
+        with t.iter_tiles(prefetch=1) as it:
+            next(it)
+        self.assertEqual(list(it), [])
+        with self.assertRaises(ValueError):
+            TilePrefetcher(t.tiles, 4, False, depth=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
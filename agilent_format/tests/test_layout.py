@@ -0,0 +1,61 @@
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from agilent_format import (agilentImage, agilentImageIFG, agilentMosaic, agilentMosaicIFG,
+                            agilentMosaicTiles, LazyMosaicArray)
+
+DAT = Path(__file__).parent.parent.joinpath("datasets/4_noimage_agg256.dat")
+SEQ = Path(__file__).parent.parent.joinpath("datasets/4_noimage_agg256.seq")
+DMT = Path(__file__).parent.parent.joinpath("datasets/5_mosaic_agg1024.dmt")
+
+
+def to_bsq(data):
+    return np.transpose(data, (2, 0, 1))
+
+
+class TestLayout(unittest.TestCase):
+
+    def test_image_bsq(self):
+        for MAT in (False, True):
+            for mmap in (False, True):
+                ai = agilentImage(DAT, MAT=MAT)
+                ai_bsq = agilentImage(DAT, MAT=MAT, mmap=mmap, layout="bsq")
+                np.testing.assert_array_equal(ai_bsq.data, to_bsq(ai.data))
+                self.assertEqual((ai_bsq.width, ai_bsq.height), (8, 8))
+        ai_bsq = agilentImage(DAT, layout="bsq")
+        self.assertTrue(ai_bsq.data.flags.c_contiguous)
+
+    def test_image_ifg_bsq(self):
+        aifg = agilentImageIFG(SEQ, MAT=True)
+        aifg_bsq = agilentImageIFG(SEQ, MAT=True, layout="bsq")
+        np.testing.assert_array_equal(aifg_bsq.data, to_bsq(aifg.data))
+
+    def test_mosaic_bsq(self):
+        for MAT in (False, True):
+            ai = agilentMosaic(DMT, MAT=MAT)
+            ai_bsq = agilentMosaic(DMT, MAT=MAT, layout="bsq", workers=2)
+            self.assertTrue(ai_bsq.data.flags.c_contiguous)
+            np.testing.assert_array_equal(ai_bsq.data, to_bsq(ai.data))
+            ai_bsq = agilentMosaic(DMT, MAT=MAT, layout="bsq", bands=[2, 3],
+                                   roi=((1, 6), (1, 3)))
+            np.testing.assert_array_equal(ai_bsq.data, to_bsq(ai.data[1:6, 1:3, 2:4]))
+
+    def test_mosaic_ifg_bsq(self):
+        aifg = agilentMosaicIFG(DMT, MAT=False)
+        aifg_bsq = agilentMosaicIFG(DMT, MAT=False, layout="bsq")
+        np.testing.assert_array_equal(aifg_bsq.data, to_bsq(aifg.data))
+
+    def test_lazy_bsq(self):
+        ai = agilentMosaic(DMT, MAT=True)
+        lazy = LazyMosaicArray(agilentMosaicTiles(DMT, MAT=True, layout="bsq"))
+        self.assertEqual(lazy.shape, (9, 8, 4))
+        data = to_bsq(ai.data)
+        np.testing.assert_array_equal(lazy[...], data)
+        np.testing.assert_array_equal(lazy[3], data[3])
+        np.testing.assert_array_equal(lazy[2:5, 6, 1:3], data[2:5, 6, 1:3])
+
+    def test_unknown_layout(self):
+        with self.assertRaises(ValueError):
+            agilentImage(DAT, layout="bil")
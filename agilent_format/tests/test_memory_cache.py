@@ -0,0 +1,88 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+import agilent_format.agilent as agilent
+from agilent_format import (agilentImage, agilentImageIFG, agilentMosaic, agilentMosaicTiles,
+                            set_tile_cache, get_tile_cache)
+
+DAT = Path(__file__).parent.parent.joinpath("datasets/4_noimage_agg256.dat")
+DMT = Path(__file__).parent.parent.joinpath("datasets/5_mosaic_agg1024.dmt")
+TILE_BYTES = 4 * 4 * 9 * 4
+
+
+class TestTileCache(unittest.TestCase):
+
+    def tearDown(self):
+        set_tile_cache(None)
+
+    def test_disabled(self):
+        self.assertIsNone(get_tile_cache())
+        tile = agilentMosaicTiles(DMT).tiles[0, 0]()
+        self.assertTrue(tile.flags.writeable)
+
+    def test_hits(self):
+        ref = agilentMosaic(DMT, MAT=True)
+        cache = set_tile_cache(10 * TILE_BYTES)
+        self.assertIs(get_tile_cache(), cache)
+        ai = agilentMosaic(DMT, MAT=True, workers=2)
+        np.testing.assert_equal(ai.data, ref.data)
+        self.assertEqual((cache.hits, cache.misses), (0, 2))
+        with mock.patch.object(agilent, "_load_tile",
+                               side_effect=AssertionError("source read")):
+            ai = agilentMosaic(DMT, MAT=True)
+            tile = agilentMosaicTiles(DMT).tiles[0, 1]()
+        np.testing.assert_equal(ai.data, ref.data)
+        self.assertFalse(tile.flags.writeable)
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['evictions']), (3, 2, 0))
+        self.assertEqual((stats['tiles'], stats['nbytes']), (2, 2 * TILE_BYTES))
+        # Band selections and layouts are cached separately
+        agilentMosaic(DMT, bands=[0, 1])
+        agilentMosaic(DMT, layout="bsq")
+        self.assertEqual(cache.stats()['tiles'], 6)
+
+    def test_byte_budget(self):
+        cache = set_tile_cache(TILE_BYTES + 1)
+        tiles = agilentMosaicTiles(DMT)
+        tiles.tiles[0, 0]()
+        tiles.tiles[0, 1]()
+        self.assertEqual(cache.stats()['tiles'], 1)
+        self.assertEqual(cache.evictions, 1)
+        tiles.tiles[0, 1]()
+        self.assertEqual(cache.hits, 1)
+        # Tiles larger than the whole budget are not cached
+        cache = set_tile_cache(TILE_BYTES - 1)
+        tiles.tiles[0, 0]()
+        self.assertEqual((cache.stats()['tiles'], cache.evictions), (0, 0))
+
+    def test_mmap_not_cached(self):
+        cache = set_tile_cache(10 * TILE_BYTES)
+        agilentMosaic(DMT, mmap=True)
+        self.assertEqual(cache.stats()['tiles'], 0)
+
+    def test_with_disk_cache(self):
+        cache = set_tile_cache(10 * TILE_BYTES)
+        with tempfile.TemporaryDirectory() as cache_dir:
+            ref = agilentMosaic(DMT, tile_cache=cache_dir)
+            ai = agilentMosaic(DMT, tile_cache=cache_dir)
+        np.testing.assert_equal(ai.data, ref.data)
+        self.assertEqual((cache.hits, cache.misses), (2, 2))
+        self.assertEqual(cache.stats()['tiles'], 2)
+
+    def test_images_writeable(self):
+        set_tile_cache(1 << 20)
+        for cls, path in ((agilentImage, DAT), (agilentImageIFG, DAT.with_suffix(".seq"))):
+            for MAT in (False, True):
+                ref = cls(path, MAT=MAT)
+                ai = cls(path, MAT=MAT)
+                self.assertTrue(ai.data.flags.writeable)
+                ai.data[0, 0, 0] = -1
+                np.testing.assert_equal(cls(path, MAT=MAT).data, ref.data)
+
+
+if __name__ == '__main__':
+    unittest.main()
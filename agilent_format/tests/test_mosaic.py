@@ -3,9 +3,10 @@ import tempfile
 import unittest
 from pathlib import Path
 
+import numpy as np
 from numpy import float64, isnan
 
-from agilent_format import agilentMosaic
+from agilent_format import agilentMosaic, agilentMosaicTiles
 
 DMT = Path(__file__).parent.parent.joinpath("datasets/5_mosaic_agg1024.dmt")
 
@@ -41,6 +42,79 @@ class TestMosaic(unittest.TestCase):
         ai = agilentMosaic(DMT, MAT=False, dtype=float64)
         self.assertAlmostEqual(ai.data[1, 2, 3], 0.28298783)
 
+    def test_load_mosaic_mmap(self):
+        ai = agilentMosaic(DMT, MAT=False)
+        ai_mm = agilentMosaic(DMT, MAT=False, mmap=True)
+        np.testing.assert_array_equal(ai_mm.data, ai.data)
+        tiles = agilentMosaicTiles(DMT, mmap=True)
+        self.assertIsInstance(tiles.tiles[0, 0](), np.memmap)
+
+    def test_load_mosaic_workers(self):
+        for MAT in (False, True):
+            ai = agilentMosaic(DMT, MAT=MAT)
+            ai_w = agilentMosaic(DMT, MAT=MAT, workers=4)
+            np.testing.assert_array_equal(ai_w.data, ai.data)
+
+    def test_load_mosaic_bands(self):
+        ai = agilentMosaic(DMT, MAT=False)
+        ai_b = agilentMosaic(DMT, MAT=False, bands=[4])
+        self.assertEqual(ai_b.data.shape, (8, 4, 1))
+        self.assertEqual(ai_b.wavenumbers, [ai.wavenumbers[4]])
+        np.testing.assert_array_equal(ai_b.data, ai.data[:, :, 4:5])
+        wn = ai.wavenumbers
+        ai_r = agilentMosaic(DMT, MAT=True, workers=2, wavenumber_range=(wn[3], wn[6]))
+        np.testing.assert_array_equal(ai_r.data[::-1], ai.data[:, :, 3:7])
+        tiles = agilentMosaicTiles(DMT, bands=[1, 2, 8])
+        self.assertEqual(tiles.tiles[0, 0]().shape, (4, 4, 3))
+
+    def test_load_mosaic_roi(self):
+        for MAT in (False, True):
+            ai = agilentMosaic(DMT, MAT=MAT)
+            ai_r = agilentMosaic(DMT, MAT=MAT, roi=((1, 6), (2, None)))
+            np.testing.assert_array_equal(ai_r.data, ai.data[1:6, 2:])
+            self.assertEqual(ai_r.info['roi'], ((1, 6), (2, 4)))
+            self.assertEqual((ai_r.height, ai_r.width), (5, 2))
+
+    def test_load_mosaic_roi_microns(self):
+        px = 5.5 * 32
+        ai = agilentMosaic(DMT, MAT=False)
+        ai_r = agilentMosaic(DMT, MAT=False, roi=((0, 2*px), (px, 3*px)), roi_units="um")
+        np.testing.assert_array_equal(ai_r.data, ai.data[0:2, 1:3])
+        ai = agilentMosaic(DMT, MAT=True)
+        ai_r = agilentMosaic(DMT, MAT=True, roi=((0, 1.5*px), (px, 3*px)), roi_units="um")
+        np.testing.assert_array_equal(ai_r.data, ai.data[6:8, 1:3])
+        with self.assertRaises(ValueError):
+            agilentMosaic(DMT, roi=((-2*px, -px), None), roi_units="um")
+
+    def test_load_mosaic_roi_skips_tiles(self):
+        """Tiles outside the ROI are never opened"""
+        with tempfile.TemporaryDirectory() as dir_name:
+            dest = Path(dir_name)
+            for f in DMT.parent.glob("5_*"):
+                shutil.copyfile(f, dest.joinpath(f.name))
+            ai = agilentMosaic(DMT, MAT=False)
+            # Corrupt tile (0, 1), which covers rows 0-3 of a non-MAT mosaic
+            dest.joinpath("5_Mosaic_agg1024_0000_0001.dmd").write_bytes(bytes(1020))
+            dmt = dest.joinpath(DMT.name)
+            ai_r = agilentMosaic(dmt, MAT=False, roi=((4, 8), None))
+            np.testing.assert_array_equal(ai_r.data, ai.data[4:8])
+            with self.assertRaises(ValueError):
+                agilentMosaic(dmt, MAT=False, roi=((3, 5), None))
+
+    def test_check_tiles(self):
+        """Missing and short tiles are reported from the directory scan"""
+        with tempfile.TemporaryDirectory() as dir_name:
+            dest = Path(dir_name)
+            for f in DMT.parent.glob("5_*"):
+                shutil.copyfile(f, dest.joinpath(f.name))
+            dmt = dest.joinpath(DMT.name)
+            self.assertEqual(agilentMosaic(dmt).check_tiles(), {'missing': [], 'short': []})
+            # Second column of tiles with only (1, 0), lower case and truncated
+            dest.joinpath("5_mosaic_agg1024_0001_0000.dmd").write_bytes(bytes(1020))
+            ai = agilentMosaicTiles(dmt)
+            self.assertEqual(ai.tiles.shape, (2, 2))
+            self.assertEqual(ai.check_tiles(), {'missing': [(1, 1)], 'short': [(1, 0)]})
+
     def test_load_mosaic_vis(self):
         ai = agilentMosaic(DMT, MAT=False)
         self.assertEqual(len(ai.vis), 2)
@@ -0,0 +1,74 @@
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from agilent_format import (agilentMosaic, agilentMosaicTiles,
+                            agilentMosaicIFG, agilentMosaicIFGTiles,
+                            LazyMosaicArray)
+
+DMT = Path(__file__).parent.parent.joinpath("datasets/5_mosaic_agg1024.dmt")
+
+KEYS = [
+    (...),
+    (0, 1, 1),
+    (slice(1, 7), slice(None), 3),
+    (slice(None, None, -1), 2),
+    (slice(3, 6), slice(0, 4, 3), slice(2, 8, 2)),
+    (Ellipsis, 4),
+    (-1,),
+]
+
+
+class TestLazyMosaic(unittest.TestCase):
+
+    def count_loads(self, tiles):
+        calls = []
+        for (x, y) in np.ndindex(tiles.tiles.shape):
+            def counted(f=tiles.tiles[x, y], xy=(x, y)):
+                calls.append(xy)
+                return f()
+            tiles.tiles[x, y] = counted
+        return calls
+
+    def test_lazy_matches_mosaic(self):
+        for MAT in (False, True):
+            ai = agilentMosaic(DMT, MAT=MAT)
+            lazy = LazyMosaicArray(agilentMosaicTiles(DMT, MAT=MAT))
+            self.assertEqual(lazy.shape, ai.data.shape)
+            self.assertEqual(lazy.dtype, ai.data.dtype)
+            for key in KEYS:
+                np.testing.assert_array_equal(lazy[key], ai.data[key])
+            np.testing.assert_array_equal(np.asarray(lazy), ai.data)
+
+    def test_lazy_ifg_matches_mosaic(self):
+        for MAT in (False, True):
+            aifg = agilentMosaicIFG(DMT, MAT=MAT)
+            lazy = LazyMosaicArray(agilentMosaicIFGTiles(DMT, MAT=MAT))
+            np.testing.assert_array_equal(lazy[2:7, 1], aifg.data[2:7, 1])
+
+    def test_lazy_loads_touched_tiles(self):
+        # Non-MAT: top rows are the last tile (y reversed)
+        tiles = agilentMosaicTiles(DMT, MAT=False)
+        calls = self.count_loads(tiles)
+        lazy = LazyMosaicArray(tiles)
+        lazy[0:2]
+        self.assertEqual(calls, [(0, 1)])
+        calls.clear()
+        lazy[5, 2, 3]
+        self.assertEqual(calls, [(0, 0)])
+        # MAT: tile numbering matches rows
+        tiles = agilentMosaicTiles(DMT, MAT=True)
+        calls = self.count_loads(tiles)
+        lazy = LazyMosaicArray(tiles)
+        lazy[0:2]
+        self.assertEqual(calls, [(0, 0)])
+
+    def test_lazy_index_errors(self):
+        lazy = LazyMosaicArray(agilentMosaicTiles(DMT))
+        with self.assertRaises(IndexError):
+            lazy[8]
+        with self.assertRaises(IndexError):
+            lazy[0, 0, 0, 0]
+        with self.assertRaises(IndexError):
+            lazy[[0, 1]]
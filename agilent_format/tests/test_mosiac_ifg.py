@@ -1,6 +1,7 @@
 import unittest
 from pathlib import Path
 
+import numpy as np
 from numpy import float64
 
 from agilent_format import agilentMosaicIFG
@@ -36,3 +37,8 @@ class TestMosaicIFG(unittest.TestCase):
     def test_load_ifg_mosaic_64(self):
         aifg = agilentMosaicIFG(DMT, MAT=False, dtype=float64)
         self.assertAlmostEqual(aifg.data[5, 1, 0], 0.7116039)
+
+    def test_load_ifg_mosaic_workers(self):
+        aifg = agilentMosaicIFG(DMT, MAT=True)
+        aifg_w = agilentMosaicIFG(DMT, MAT=True, workers=2)
+        np.testing.assert_array_equal(aifg_w.data, aifg.data)
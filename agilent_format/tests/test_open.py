@@ -0,0 +1,88 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+import agilent_format.agilent as agilent
+from agilent_format import (open_dataset, agilentImage, agilentImageIFG,
+                            agilentMosaic, agilentMosaicIFG, DirectoryIndex)
+
+DATASETS = Path(__file__).parent.parent.joinpath("datasets")
+DAT = DATASETS.joinpath("4_noimage_agg256.dat")
+SEQ = DATASETS.joinpath("4_noimage_agg256.seq")
+BSP = DATASETS.joinpath("4_noimage_agg256.bsp")
+DMT = DATASETS.joinpath("5_mosaic_agg1024.dmt")
+DMS = DATASETS.joinpath("5_Mosaic_agg1024.dms")
+
+
+class TestOpenDataset(unittest.TestCase):
+
+    def test_dispatch(self):
+        cases = [(DAT, False, agilentImage), (SEQ, False, agilentImageIFG),
+                 (BSP, False, agilentImage), (BSP, True, agilentImageIFG),
+                 (DMT, False, agilentMosaic), (DMT, True, agilentMosaicIFG),
+                 (DMS, False, agilentMosaic), (DMS, True, agilentMosaicIFG)]
+        for path, ifg, reader in cases:
+            obj = open_dataset(path, load_data=False, ifg=ifg)
+            self.assertIs(type(obj), reader)
+
+    def test_dms(self):
+        np.testing.assert_equal(open_dataset(DMS).data, agilentMosaic(DMT).data)
+
+    def test_unknown_suffix(self):
+        with self.assertRaises(ValueError):
+            open_dataset(DATASETS.joinpath("IrCutout.bmp"))
+
+    def test_metadata_only(self):
+        for path, ifg in ((DAT, False), (SEQ, False), (DMT, False), (DMT, True)):
+            for layout in ("bip", "bsq"):
+                lazy = open_dataset(path, load_data=False, ifg=ifg, layout=layout)
+                self.assertEqual(lazy.data.size, 0)
+                full = open_dataset(path, ifg=ifg, layout=layout)
+                self.assertEqual(lazy.shape, full.data.shape)
+                self.assertEqual(lazy.info['fpasize'], full.info['fpasize'])
+                np.testing.assert_equal(lazy.load(), full.data)
+                np.testing.assert_equal(lazy.data, full.data)
+
+    def test_deferred_options(self):
+        lazy = open_dataset(DMT, load_data=False, MAT=True, bands=[2, 5], roi=((2, 6), None))
+        self.assertEqual(lazy.shape, (4, 4, 2))
+        full = agilentMosaic(DMT, MAT=True, bands=[2, 5], roi=((2, 6), None))
+        np.testing.assert_equal(lazy.load(), full.data)
+        lazy = open_dataset(DAT, load_data=False, MAT=True, bands=[0, 8])
+        self.assertEqual(lazy.shape, (8, 8, 2))
+        np.testing.assert_equal(lazy.load(), agilentImage(DAT, MAT=True, bands=[0, 8]).data)
+
+    def test_no_pixel_reads(self):
+        read = AssertionError("pixel data read")
+        for path, ifg in ((DAT, False), (SEQ, False), (DMT, False), (DMT, True)):
+            for mmap in (False, True):
+                with mock.patch.object(agilent, "_load_tile", side_effect=read), \
+                        mock.patch.object(np, "memmap", side_effect=read):
+                    lazy = open_dataset(path, load_data=False, ifg=ifg, mmap=mmap)
+                self.assertEqual(lazy.data.size, 0)
+                self.assertEqual(lazy.load().shape, lazy.shape)
+
+    def test_shared_index(self):
+        with tempfile.TemporaryDirectory() as dir_name:
+            dest = Path(dir_name)
+            for name in ("4_noimage_agg256.bsp", "4_noimage_agg256.dat", "5_mosaic_agg1024.dmt",
+                         "5_Mosaic_agg1024_0000_0000.dmd", "5_Mosaic_agg1024_0000_0001.dmd"):
+                shutil.copyfile(DATASETS.joinpath(name), dest.joinpath(name))
+            for i in range(50):
+                dest.joinpath("other_{}.dat".format(i)).touch()
+            index = DirectoryIndex(dest)
+            image = open_dataset(dest.joinpath(DAT.name), load_data=False, index=index)
+            mosaic = open_dataset(dest.joinpath(DMT.name), load_data=False, index=index)
+            self.assertIs(image.index, index)
+            self.assertIs(mosaic.index, index)
+            # Only the data files and the first tile were stat()ed
+            self.assertEqual(set(index._sizes), {"4_noimage_agg256.dat",
+                                                 "5_Mosaic_agg1024_0000_0000.dmd"})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from agilent_format import agilentMosaic, agilentMosaicIFG
+
+DMT = Path(__file__).parent.parent.joinpath("datasets/5_mosaic_agg1024.dmt")
+
+
+class TestMosaicOut(unittest.TestCase):
+
+    def test_max_memory(self):
+        for reader in (agilentMosaic, agilentMosaicIFG):
+            for MAT in (False, True):
+                ai = reader(DMT, MAT=MAT)
+                with tempfile.TemporaryDirectory() as scratch:
+                    ai_m = reader(DMT, MAT=MAT, max_memory=ai.data.nbytes - 1,
+                                  scratch_dir=scratch)
+                    self.assertIsInstance(ai_m.data, np.memmap)
+                    np.testing.assert_equal(ai_m.data, ai.data)
+                    del ai_m
+                ai_m = reader(DMT, MAT=MAT, max_memory=ai.data.nbytes)
+                self.assertNotIsInstance(ai_m.data, np.memmap)
+
+    def test_out_file(self):
+        ai = agilentMosaic(DMT, MAT=True, bands=[0, 3])
+        with tempfile.TemporaryDirectory() as scratch:
+            out = Path(scratch, "mosaic.raw")
+            ai_m = agilentMosaic(DMT, MAT=True, bands=[0, 3], out=out)
+            self.assertIsInstance(ai_m.data, np.memmap)
+            del ai_m
+            stored = np.fromfile(out, dtype=np.float32).reshape(ai.data.shape)
+            np.testing.assert_equal(stored, ai.data)
+
+    def test_out_array(self):
+        ai = agilentMosaic(DMT, layout="bsq")
+        out = np.empty(ai.data.shape, dtype=np.float32)
+        ai_o = agilentMosaic(DMT, layout="bsq", out=out)
+        self.assertIs(ai_o.data, out)
+        np.testing.assert_equal(out, ai.data)
+        with self.assertRaises(ValueError):
+            agilentMosaic(DMT, out=np.empty(ai.data.shape, dtype=np.float64))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+import agilent_format.agilent as agilent
+from agilent_format import (quicklook, agilentImage, agilentMosaic, agilentMosaicTiles,
+                            agilentMosaicIFG, agilentMosaicIFGTiles)
+
+DAT = Path(__file__).parent.parent.joinpath("datasets/4_noimage_agg256.dat")
+DMT = Path(__file__).parent.parent.joinpath("datasets/5_mosaic_agg1024.dmt")
+
+
+def trapezoid(y, x):
+    return ((y[..., 1:] + y[..., :-1]) / 2 * np.diff(x)).sum(axis=-1)
+
+
+class TestQuicklook(unittest.TestCase):
+
+    def test_reductions(self):
+        for MAT in (False, True):
+            data = agilentMosaic(DMT, MAT=MAT).data.astype(np.float64)
+            for layout in ("bip", "bsq"):
+                for dataset in (agilentMosaicTiles(DMT, MAT=MAT, layout=layout),
+                                agilentMosaic(DMT, MAT=MAT, layout=layout),
+                                agilentMosaic(DMT, MAT=MAT, layout=layout, load_data=False)):
+                    for reduction in ("sum", "mean", "max", "min"):
+                        np.testing.assert_allclose(quicklook(dataset, reduction),
+                                                   getattr(data, reduction)(axis=2))
+
+    def test_window_and_integral(self):
+        ai = agilentMosaic(DMT, MAT=True)
+        wn = np.array(ai.wavenumbers)
+        window = (wn > 2000) & (wn < 2080)
+        ref = trapezoid(ai.data[..., window].astype(np.float64), wn[window])
+        for layout in ("bip", "bsq"):
+            tiles = agilentMosaicTiles(DMT, MAT=True, layout=layout)
+            np.testing.assert_allclose(
+                quicklook(tiles, "integral", wavenumber_range=(2000, 2080)), ref, rtol=1e-6)
+        np.testing.assert_allclose(
+            quicklook(DMT, "integral", wavenumber_range=(2000, 2080), MAT=True), ref, rtol=1e-6)
+        np.testing.assert_allclose(
+            quicklook(DMT, "max", wavenumber_range=(2000, 2080), prefetch=2, MAT=True),
+            ai.data[..., window].max(axis=2))
+        np.testing.assert_allclose(quicklook(ai, "integral"), trapezoid(ai.data, wn), rtol=1e-6)
+
+    def test_roi(self):
+        for MAT in (False, True):
+            for layout in ("bip", "bsq"):
+                for roi, reads in ((((0, 4), (0, 2)), 1), (((2, 6), (1, 3)), 2)):
+                    ref = agilentMosaic(DMT, MAT=MAT, layout=layout, roi=roi)
+                    ai = agilentMosaic(DMT, MAT=MAT, layout=layout, roi=roi, load_data=False)
+                    with mock.patch.object(agilent, "_load_tile",
+                                           wraps=agilent._load_tile) as load:
+                        image = quicklook(ai, "max")
+                    self.assertEqual(load.call_count, reads)
+                    np.testing.assert_allclose(image, ref.data.max(axis=0 if layout == "bsq"
+                                                                   else 2))
+
+    def test_image(self):
+        ai = agilentImage(DAT, MAT=True)
+        np.testing.assert_allclose(quicklook(agilentImage(DAT, MAT=True, load_data=False)),
+                                   ai.data.sum(axis=2), rtol=1e-6)
+
+    def test_ifg(self):
+        ifg = agilentMosaicIFG(DMT)
+        np.testing.assert_allclose(quicklook(agilentMosaicIFGTiles(DMT), "mean"),
+                                   ifg.data.mean(axis=2), rtol=1e-6)
+        with self.assertRaises(ValueError):
+            quicklook(agilentMosaicIFGTiles(DMT), "integral")
+        with self.assertRaises(ValueError):
+            quicklook(ifg, "median")
+
+
+if __name__ == '__main__':
+    unittest.main()
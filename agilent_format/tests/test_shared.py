@@ -0,0 +1,76 @@
+import gc
+import pickle
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from pathlib import Path
+
+import numpy as np
+
+from agilent_format import agilentMosaic
+
+DMT = Path(__file__).parent.parent.joinpath("datasets/5_mosaic_agg1024.dmt")
+
+
+def tile_sums(handle, coords):
+    """Worker: sum each assigned tile, then scale it in place"""
+    with handle as mosaic:
+        sums = {}
+        for x, y, view in mosaic.iter_tiles(coords):
+            sums[x, y] = float(view.sum(dtype=np.float64))
+            view *= 2
+            del view
+    return sums
+
+
+class TestShared(unittest.TestCase):
+
+    def test_shared_mosaic(self):
+        for MAT in (False, True):
+            for layout in ("bip", "bsq"):
+                ref = agilentMosaic(DMT, MAT=MAT, layout=layout)
+                ai = agilentMosaic(DMT, MAT=MAT, layout=layout, shared=True)
+                try:
+                    np.testing.assert_array_equal(ai.data, ref.data)
+                    handle = pickle.loads(pickle.dumps(ai.shared))
+                    for x, y, rows, cols, tile in ref.iter_tiles():
+                        np.testing.assert_array_equal(handle.tile(x, y), tile)
+                    handle.close()
+                finally:
+                    ai.close_shared()
+                self.assertIsNone(ai.shared)
+                self.assertEqual(ai.data.size, 0)
+
+    def test_worker_processes(self):
+        ai = agilentMosaic(DMT, shared=True, load_data=False)
+        self.assertIsNone(ai.shared)
+        ai.load()
+        try:
+            ref = ai.data.copy()
+            parts = ai.shared.split(2)
+            self.assertEqual(sum(parts, []), [(0, 0), (0, 1)])
+            with ProcessPoolExecutor(max_workers=2) as executor:
+                results = list(executor.map(tile_sums, [ai.shared] * 2, parts))
+            sums = {k: v for r in results for k, v in r.items()}
+            for x, y, rows, cols, tile in ai.iter_tiles():
+                self.assertAlmostEqual(sums[x, y], tile.sum(dtype=np.float64), places=2)
+            # Workers wrote through their views
+            np.testing.assert_array_equal(ai.data, ref * 2)
+        finally:
+            ai.close_shared()
+
+    def test_unlinked_without_close(self):
+        ai = agilentMosaic(DMT, shared=True)
+        name = ai.shared.name
+        del ai
+        gc.collect()
+        with self.assertRaises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            agilentMosaic(DMT, shared=True, roi=((0, 4), (0, 4)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from agilent_format import (agilentMosaic, agilentMosaicIFG, agilentMosaicTiles,
+                            ifg_spectra, quicklook)
+
+DMT = Path(__file__).parent.parent.joinpath("datasets/5_mosaic_agg1024.dmt")
+
+
+def partial_mosaic(dest):
+    """2 x 2 tile mosaic with tile (1, 1) missing"""
+    shutil.copyfile(DMT, dest.joinpath(DMT.name))
+    for ext in (".dmd", ".drd"):
+        for y in (0, 1):
+            name = "5_Mosaic_agg1024_0000_{:04d}{}".format(y, ext)
+            shutil.copyfile(DMT.parent.joinpath(name), dest.joinpath(name))
+        shutil.copyfile(DMT.parent.joinpath("5_Mosaic_agg1024_0000_0000" + ext),
+                        dest.joinpath("5_Mosaic_agg1024_0001_0000" + ext))
+    return dest.joinpath(DMT.name)
+
+
+class TestSparse(unittest.TestCase):
+
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.dmt = partial_mosaic(Path(self._dir.name))
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def test_present(self):
+        tiles = agilentMosaicTiles(self.dmt)
+        np.testing.assert_array_equal(tiles.present, [[True, True], [True, False]])
+        self.assertFalse(tiles.sparse)
+        self.assertEqual([xy[:2] for xy in tiles.iter_tiles(skip_missing=True)],
+                         [(0, 0), (0, 1), (1, 0)])
+        self.assertEqual(len(list(tiles.iter_tiles())), 4)
+
+    def test_sparse_mosaic(self):
+        for MAT in (False, True):
+            for layout in ("bip", "bsq"):
+                dense = agilentMosaic(self.dmt, MAT=MAT, layout=layout)
+                ai = agilentMosaic(self.dmt, MAT=MAT, layout=layout, sparse=True)
+                self.assertEqual(ai.data.size, 0)
+                self.assertEqual(sorted(ai.tile_data), [(0, 0), (0, 1), (1, 0)])
+                # Iteration and quick-looks use the loaded tiles
+                ai.tiles[1, 0] = None
+                visited = [xy[:2] for xy in ai.iter_tiles(prefetch=2)]
+                self.assertEqual(visited, [(0, 0), (0, 1), (1, 0)])
+                np.testing.assert_array_equal(quicklook(ai, "max"),
+                                              dense.data.max(axis=0 if layout == "bsq" else 2))
+                data = ai.densify()
+                self.assertIs(ai.data, data)
+                np.testing.assert_array_equal(data, dense.data)
+
+    def test_sparse_load(self):
+        ai = agilentMosaic(self.dmt, sparse=True, load_data=False, workers=2)
+        self.assertIsNone(ai.tile_data)
+        self.assertEqual(len(ai.load()), 3)
+        np.testing.assert_array_equal(
+            agilentMosaic(self.dmt, sparse=True, load_data=False).densify(),
+            agilentMosaic(self.dmt).data)
+        with self.assertRaises(ValueError):
+            agilentMosaic(self.dmt, sparse=True, roi=((0, 4), (0, 4)))
+
+    def test_skip_absent(self):
+        tiles = agilentMosaicTiles(self.dmt)
+
+        def fail(*args, **kwargs):
+            raise AssertionError("absent tile loaded")
+        tiles.tiles[1, 1] = fail
+        image = quicklook(tiles, "sum", prefetch=2)
+        self.assertTrue(np.isnan(image[:4, 4:]).all())
+        self.assertFalse(np.isnan(image[4:]).any())
+
+    def test_sparse_ifg(self):
+        ifg = agilentMosaicIFG(self.dmt, sparse=True)
+        self.assertEqual(len(ifg.tile_data), 3)
+        spectra, _ = ifg_spectra(ifg)
+        ref, _ = ifg_spectra(agilentMosaicIFG(self.dmt))
+        np.testing.assert_array_equal(spectra, ref)
+        np.testing.assert_array_equal(ifg.densify(), agilentMosaicIFG(self.dmt).data)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from agilent_format import agilentImage, agilentMosaic
+
+DAT = Path(__file__).parent.parent.joinpath("datasets/4_noimage_agg256.dat")
+DMT = Path(__file__).parent.parent.joinpath("datasets/5_mosaic_agg1024.dmt")
+
+
+def band_mean(data, n, axis=-1):
+    data = np.moveaxis(data, axis, -1)
+    m = data.shape[-1] // n * n
+    binned = data[..., :m].reshape(data.shape[:-1] + (m // n, n)).mean(axis=-1)
+    return np.moveaxis(binned, -1, axis)
+
+
+class TestSpectralBin(unittest.TestCase):
+
+    def test_image(self):
+        full = agilentImage(DAT, MAT=True)
+        for layout, axis in (("bip", -1), ("bsq", 0)):
+            ai = agilentImage(DAT, MAT=True, spectral_bin=2, layout=layout)
+            # 9 bands, the incomplete last group is dropped
+            self.assertEqual(ai.info['Npts'], 4)
+            np.testing.assert_allclose(ai.data, band_mean(np.moveaxis(full.data, -1, axis),
+                                                          2, axis), rtol=1e-6)
+            np.testing.assert_allclose(ai.wavenumbers,
+                                       band_mean(np.array(full.wavenumbers), 2))
+        self.assertEqual(ai.info['PtSep'], 2 * full.info['PtSep'])
+        self.assertEqual(ai.info['spectral_bin'], 2)
+
+    def test_mosaic(self):
+        full = agilentMosaic(DMT, MAT=True)
+        for workers in (None, 2):
+            ai = agilentMosaic(DMT, MAT=True, spectral_bin=3, workers=workers, bin=2)
+            ref = band_mean(full.data, 3)
+            r, c, n = ref.shape
+            ref = ref.reshape(r // 2, 2, c // 2, 2, n).mean(axis=(1, 3))
+            np.testing.assert_allclose(ai.data, ref, rtol=1e-6)
+        np.testing.assert_allclose(ai.wavenumbers, band_mean(np.array(full.wavenumbers), 3))
+
+    def test_resolution(self):
+        full = agilentMosaic(DMT)
+        # Acquired at 32 cm-1 with PtSep ~15.4 cm-1
+        self.assertEqual(full.info['Resolution'], 32)
+        ai = agilentMosaic(DMT, resolution=64, wavenumber_range=(2000, 2100))
+        self.assertEqual(ai.info['spectral_bin'], 2)
+        wn = np.array(full.wavenumbers)
+        window = np.nonzero((wn >= 2000) & (wn <= 2100))[0]
+        np.testing.assert_allclose(ai.data, band_mean(full.data[..., window], 2), rtol=1e-6)
+        np.testing.assert_allclose(ai.wavenumbers, band_mean(wn[window], 2))
+        self.assertEqual(agilentMosaic(DMT, resolution=128, load_data=False).spectral_bin, 4)
+        self.assertEqual(agilentMosaic(DMT, resolution=32).data.shape, (8, 4, 9))
+
+    def test_resolution_info(self):
+        full = agilentMosaic(DMT, load_data=False)
+        for kwargs in ({'resolution': 64}, {'spectral_bin': 2}):
+            ai = agilentMosaic(DMT, load_data=False, **kwargs)
+            self.assertEqual(ai.info['Resolution'], 64)
+            self.assertAlmostEqual(ai.info['PtSep'], 2 * full.info['PtSep'])
+            # StartPt is the centre of the first pair of bands
+            self.assertEqual(ai.info['StartPt'], (full.info['StartPt'] + 0.5) / 2)
+            np.testing.assert_allclose(
+                ai.wavenumbers,
+                ai.info['PtSep'] * (ai.info['StartPt'] + np.arange(ai.info['Npts'])))
+
+    def test_resolution_invalid(self):
+        # Finer than acquired, and not a whole multiple of it
+        for resolution in (16, 48):
+            with self.assertRaises(ValueError):
+                agilentMosaic(DMT, resolution=resolution, load_data=False)
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            agilentMosaic(DMT, spectral_bin=2, resolution=30)
+        with self.assertRaises(ValueError):
+            agilentMosaic(DMT, spectral_bin=2, bands=[0, 1, 3])
+        with self.assertRaises(ValueError):
+            agilentMosaic(DMT, spectral_bin=10)
+
+
+if __name__ == '__main__':
+    unittest.main()
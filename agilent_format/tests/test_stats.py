@@ -0,0 +1,108 @@
+import json
+import threading
+import tracemalloc
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+from agilent_format import (LoadStats, agilentImage, agilentImageIFG, agilentMosaic,
+                            agilentMosaicIFG, agilentMosaicTiles)
+
+DAT = Path(__file__).parent.parent.joinpath("datasets/4_noimage_agg256.dat")
+DMT = Path(__file__).parent.parent.joinpath("datasets/5_mosaic_agg1024.dmt")
+
+
+class TestStats(unittest.TestCase):
+
+    def test_disabled(self):
+        self.assertIsNone(agilentMosaic(DMT).stats)
+        self.assertIsNone(agilentImage(DAT).stats)
+
+    def test_mosaic(self):
+        ai = agilentMosaic(DMT, stats="memory", workers=2)
+        stats = ai.stats
+        self.assertIsInstance(stats, LoadStats)
+        self.assertEqual(stats.reader, "agilentMosaic")
+        self.assertEqual(set(stats.phases),
+                         {'scan', 'resolve', 'header', 'setup', 'vis', 'load'})
+        self.assertEqual(len(stats.tiles), 2)
+        self.assertEqual(stats.read_bytes, 2 * 4 * 4 * 9 * 4)
+        self.assertEqual(sorted(t[0] for t in stats.tiles),
+                         ["5_Mosaic_agg1024_0000_0000.dmd", "5_Mosaic_agg1024_0000_0001.dmd"])
+        self.assertGreater(stats.copy_time, 0)
+        self.assertGreaterEqual(stats.peak_bytes, ai.data.nbytes)
+        record = json.loads(json.dumps(stats.as_dict()))
+        self.assertEqual(record['tiles_read'], 2)
+
+    def test_hook_and_logging(self):
+        events = []
+        with self.assertLogs("agilent_format.agilent", "INFO") as logs:
+            ai = agilentMosaicIFG(DMT, stats=events.append, load_data=False)
+            self.assertEqual(len(events), 1)
+            ai.load()
+        self.assertEqual(events, [ai.stats, ai.stats])
+        self.assertEqual([r.stats['phases'].keys() >= {'header', 'scan'} for r in logs.records],
+                         [True, True])
+        self.assertIn("load", logs.records[1].getMessage())
+        self.assertEqual(logs.records[1].stats['tiles_read'], 2)
+
+    def test_images(self):
+        for cls, path in ((agilentImage, DAT), (agilentImageIFG, DAT.with_suffix(".seq"))):
+            obj = cls(path, stats=True)
+            self.assertEqual(obj.stats.read_bytes, obj.data.nbytes)
+            self.assertIn('load', obj.stats.phases)
+
+    def test_tiles(self):
+        tiles = agilentMosaicTiles(DMT, stats=True)
+        self.assertEqual(tiles.stats.tiles, [])
+        for _ in tiles.iter_tiles():
+            pass
+        self.assertEqual(len(tiles.stats.tiles), 2)
+
+    def test_timing_only(self):
+        with mock.patch.object(tracemalloc, "start",
+                               side_effect=AssertionError("tracing started")):
+            ai = agilentMosaic(DMT, stats=True)
+        self.assertIsNone(ai.stats.peak_bytes)
+        self.assertIsNone(ai.stats.as_dict()['peak_bytes'])
+        self.assertEqual(ai.stats.read_bytes, ai.data.nbytes)
+
+    def test_peak_already_tracing(self):
+        tracemalloc.start()
+        try:
+            big = np.ones(1 << 22)
+            del big
+            stats = LoadStats("test", "x", memory=True)
+            with stats.phase("load"):
+                pass
+            self.assertLess(stats.peak_bytes, 1 << 20)
+            self.assertTrue(tracemalloc.is_tracing())
+        finally:
+            tracemalloc.stop()
+
+    def test_overlapping_phases(self):
+        first, second = LoadStats("test", "a", memory=True), LoadStats("test", "b", memory=True)
+        started, entered = threading.Event(), threading.Event()
+
+        def other():
+            with first.phase("load"):
+                started.set()
+                entered.wait()
+
+        thread = threading.Thread(target=other)
+        thread.start()
+        started.wait()
+        with second.phase("load"):
+            entered.set()
+            thread.join()
+            # The phase that started tracing ended, leaving it on for this one
+            self.assertTrue(tracemalloc.is_tracing())
+            data = np.ones(1 << 18)
+        self.assertGreaterEqual(second.peak_bytes, data.nbytes)
+        self.assertFalse(tracemalloc.is_tracing())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from agilent_format import (agilentImage, agilentImageIFG, agilentMosaic, agilentMosaicIFG,
+                            ifg_spectra)
+from agilent_format.synthetic import TIME_STAMP, axes, write_image, write_mosaic
+
+
+class TestSynthetic(unittest.TestCase):
+
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.dir = Path(self._dir.name)
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def test_image(self):
+        dat = write_image(self.dir, fpa=8, npts=20, resolution=8)
+        (PtSep, StartPt, Npts), ifg = axes(20)
+        ai = agilentImage(dat, MAT=True)
+        self.assertEqual(ai.data.shape, (8, 8, 20))
+        self.assertEqual(ai.info['StartPt'], StartPt)
+        self.assertAlmostEqual(ai.info['PtSep'], PtSep)
+        self.assertEqual(ai.info['Resolution'], 8)
+        self.assertEqual(ai.info['PixelAggregationSize'], 16)
+        self.assertEqual(ai.info['FPA Pixel Size'], 5.5)
+        self.assertEqual(ai.info['Symmetry'], "ASYM")
+        self.assertEqual(ai.acqdate, TIME_STAMP)
+        raw = np.fromfile(dat, dtype='<f')[255:].reshape(20, 8, 8)
+        np.testing.assert_array_equal(agilentImage(dat, layout="bsq").data, raw)
+
+        seq = agilentImageIFG(dat.with_suffix(".seq"))
+        self.assertEqual((seq.info['PtSep'], seq.info['StartPt'], seq.info['Npts']), ifg)
+        self.assertEqual(seq.data.shape, (8, 8, ifg[2]))
+
+    def test_mosaic(self):
+        dmt = write_mosaic(self.dir, "grid", fpa=4, npts=10, tiles=(3, 2), ifg_npts=160)
+        am = agilentMosaic(dmt)
+        self.assertEqual(am.tiles.shape, (3, 2))
+        self.assertEqual(am.data.shape, (8, 12, 10))
+        self.assertEqual(am.info['PixelAggregationSize'], 32)
+        # Resolution defaults to twice the point separation
+        self.assertEqual(am.info['Resolution'], round(2 * am.info['PtSep']))
+        self.assertFalse(np.isnan(am.data).any())
+        ifg = agilentMosaicIFG(dmt)
+        self.assertEqual(ifg.data.shape, (8, 12, 160))
+        self.assertEqual(ifg.info['StartPt'], -20)
+        # The spectral axis matches the interferogram transform
+        _, wavenumbers = ifg_spectra(ifg, wavenumber_range=(am.wavenumbers[0] - 1,
+                                                            am.wavenumbers[-1] + 1))
+        np.testing.assert_allclose(wavenumbers, am.wavenumbers)
+
+    def test_axes(self):
+        with self.assertRaises(ValueError):
+            axes(10, ifg_npts=64)
+
+    def test_spectral_only(self):
+        dmt = write_mosaic(self.dir, fpa=2, npts=5, tiles=(1, 1), ifg=False)
+        self.assertEqual(sorted(p.suffix for p in self.dir.iterdir()), [".dmd", ".dmt"])
+        self.assertEqual(agilentMosaic(dmt).data.shape, (2, 2, 5))
+
+
+if __name__ == "__main__":
+    unittest.main()
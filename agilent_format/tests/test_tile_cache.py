@@ -0,0 +1,127 @@
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+import agilent_format.agilent as agilent
+from agilent_format import agilentMosaic, agilentMosaicIFG, DiskTileCache
+
+DMT = Path(__file__).parent.parent.joinpath("datasets/5_mosaic_agg1024.dmt")
+
+
+class TestDiskTileCache(unittest.TestCase):
+
+    def setUp(self):
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.cache_dir = Path(self._temp_dir.name, "cache")
+
+    def tearDown(self):
+        self._temp_dir.cleanup()
+
+    def entries(self):
+        return sorted(p.name for p in self.cache_dir.glob("*.npy"))
+
+    def test_warm_open(self):
+        for MAT in (False, True):
+            for layout in ("bip", "bsq"):
+                ai = agilentMosaic(DMT, MAT=MAT, layout=layout)
+                cold = agilentMosaic(DMT, MAT=MAT, layout=layout, tile_cache=self.cache_dir)
+                np.testing.assert_equal(cold.data, ai.data)
+                with mock.patch.object(agilent, "_load_tile",
+                                       side_effect=AssertionError("source read")):
+                    warm = agilentMosaic(DMT, MAT=MAT, layout=layout,
+                                         tile_cache=self.cache_dir)
+                np.testing.assert_equal(warm.data, ai.data)
+        # One entry per tile and layout
+        self.assertEqual(len(self.entries()), 4)
+
+    def test_keys(self):
+        cache = DiskTileCache(self.cache_dir)
+        agilentMosaic(DMT, tile_cache=cache)
+        agilentMosaic(DMT, tile_cache=cache, bands=[1, 2])
+        agilentMosaicIFG(DMT, tile_cache=cache)
+        self.assertEqual(len(self.entries()), 6)
+        tile = agilentMosaic(DMT, tile_cache=cache, load_data=False).tiles[0, 0]()
+        self.assertIsInstance(tile, np.memmap)
+        ai = agilentMosaic(DMT, bands=[1, 2], tile_cache=cache)
+        np.testing.assert_equal(ai.data, agilentMosaic(DMT, bands=[1, 2]).data)
+
+    def test_source_changed(self):
+        src = Path(self._temp_dir.name, "src")
+        src.mkdir()
+        for f in DMT.parent.glob("5_*"):
+            shutil.copyfile(f, src.joinpath(f.name))
+        dmt = src.joinpath(DMT.name)
+        agilentMosaic(dmt, tile_cache=self.cache_dir)
+        dmd = src.joinpath("5_Mosaic_agg1024_0000_0000.dmd")
+        data = bytearray(dmd.read_bytes())
+        data[1020:1024] = np.float32(42).tobytes()
+        dmd.write_bytes(bytes(data))
+        st = dmd.stat()
+        os.utime(dmd, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        ai = agilentMosaic(dmt, tile_cache=self.cache_dir, layout="bsq")
+        self.assertEqual(ai.data[0, 4, 0], 42)
+
+    def test_corrupt_entry(self):
+        cache = DiskTileCache(self.cache_dir)
+        ai = agilentMosaic(DMT, tile_cache=cache)
+        for name in self.entries():
+            self.cache_dir.joinpath(name).write_bytes(b"broken")
+        np.testing.assert_equal(agilentMosaic(DMT, tile_cache=cache).data, ai.data)
+
+    def test_lru_eviction(self):
+        cache = DiskTileCache(self.cache_dir)
+        agilentMosaic(DMT, tile_cache=cache)
+        entry_size = cache.nbytes // 2
+        cache.clear()
+        self.assertEqual(self.entries(), [])
+
+        cache = DiskTileCache(self.cache_dir, max_bytes=2 * entry_size)
+        bip = agilentMosaic(DMT, tile_cache=cache, load_data=False)
+        bip.tiles[0, 0]()
+        bip.tiles[0, 1]()
+        # Re-use (0, 0) so (0, 1) is least recently used
+        bip.tiles[0, 0]()
+        agilentMosaic(DMT, tile_cache=cache, layout="bsq", load_data=False).tiles[0, 0]()
+        self.assertEqual(len(self.entries()), 2)
+        self.assertEqual(cache.nbytes, 2 * entry_size)
+        with mock.patch.object(agilent, "_load_tile",
+                               side_effect=AssertionError("source read")):
+            bip.tiles[0, 0]()
+            with self.assertRaises(AssertionError):
+                bip.tiles[0, 1]()
+        # Existing entries are counted by a new cache object
+        cache = DiskTileCache(self.cache_dir, max_bytes=2 * entry_size)
+        self.assertEqual(cache.nbytes, 2 * entry_size)
+
+    def test_shared_per_directory(self):
+        first = agilentMosaic(DMT, tile_cache=self.cache_dir, load_data=False)
+        second = agilentMosaicIFG(DMT, tile_cache=str(self.cache_dir), load_data=False)
+        self.assertIs(first.tile_cache, second.tile_cache)
+        self.assertEqual(first.tile_cache.max_bytes, 16 << 30)
+        third = agilentMosaic(DMT, tile_cache=self.cache_dir, tile_cache_max_bytes=1000)
+        self.assertIs(third.tile_cache, first.tile_cache)
+        self.assertEqual(first.tile_cache.max_bytes, 1000)
+        # A removed directory gets a new cache
+        shutil.rmtree(self.cache_dir)
+        fourth = agilentMosaic(DMT, tile_cache=self.cache_dir)
+        self.assertIsNot(fourth.tile_cache, first.tile_cache)
+        self.assertEqual(len(self.entries()), 2)
+
+    def test_resolve_once(self):
+        resolve = Path.resolve
+        with mock.patch.object(Path, "resolve", autospec=True, side_effect=resolve) as calls:
+            ai = agilentMosaic(DMT, tile_cache=self.cache_dir)
+            ai.load()
+        resolved = [c.args[0] for c in calls.call_args_list]
+        # The tile directory once per reader, not each tile
+        self.assertEqual(resolved.count(DMT.parent), 1)
+        self.assertFalse([p for p in resolved if p.suffix == ".dmd"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,13 @@
+import tempfile
 import unittest
+from pathlib import Path
+
+import numpy as np
 
 from agilent_format import agilent
 
+DMD = Path(__file__).parent.parent.joinpath("datasets/5_Mosaic_agg1024_0000_0000.dmd")
+
 class TestUtils(unittest.TestCase):
 
     def test_fpa_size(self):
@@ -14,3 +20,24 @@ class TestUtils(unittest.TestCase):
         datasize = 64 * 32 * Npts + 255
         with self.assertRaises(ValueError):
             agilent._fpa_size(datasize, Npts)
+
+    def test_load_tile_size_mismatch(self):
+        with tempfile.TemporaryDirectory() as dir_name:
+            p = Path(dir_name, "short_0000_0000.dmd")
+            p.write_bytes(bytes(255*4 + 4*4*3*4))
+            agilent._load_tile(p, (3, 4, 4))
+            with self.assertRaises(ValueError):
+                agilent._load_tile(p, (4, 4, 4))
+            with self.assertRaises(ValueError):
+                agilent._load_tile(p, (2, 4, 4))
+
+    def test_tile_loader_out(self):
+        loader = agilent.make_tile_loader(DMD, 9, 4)
+        tile = loader()
+        out = np.zeros((4, 4, 9), dtype=np.float64)
+        loader(out=out)
+        np.testing.assert_array_equal(out, tile)
+        buf = np.empty((9, 4, 4), dtype='<f')
+        out_flip = np.zeros((4, 4, 9))
+        loader(out=np.flipud(out_flip), buf=buf)
+        np.testing.assert_array_equal(out_flip, np.flipud(tile))
@@ -0,0 +1,73 @@
+"""
+Benchmark mosaic assembly throughput against the previous tile-by-tile loop.
+
+The previous loop read each tile with np.fromfile, transposed it and copied it
+into the output with a single strided assignment.
+
+Usage:
+    python benchmarks/bench_assembly.py [--fpa 128] [--npts 400] [--tiles 4 4]
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from agilent_format import agilentMosaic, agilentMosaicTiles
+from agilent_format.agilent import _tile_slices
+from agilent_format.synthetic import write_mosaic
+
+
+def legacy_assembly(dmt, dtype):
+    """The tile loop as it was before fused read-into-destination assembly"""
+    am = agilentMosaicTiles(dmt)
+    xtiles, ytiles = am.tiles.shape
+    Npts = am.info['Npts']
+    fpasize = am.info['fpasize']
+    data = np.zeros((ytiles*fpasize, xtiles*fpasize, Npts), dtype=dtype)
+    for (x, y) in np.ndindex(am.tiles.shape):
+        p = Path(am.filename).with_name("bench_{0:04d}_{1:04d}.dmd".format(x, y))
+        with p.open(mode='rb') as f:
+            tile = np.fromfile(f, dtype='<f')
+        tile = tile[255:]
+        tile.shape = (Npts, fpasize, fpasize)
+        tile = np.transpose(tile, (1, 2, 0))
+        rows, cols = _tile_slices(x, y, ytiles, fpasize, False)
+        data[rows, cols, :] = tile
+    return data
+
+
+def best_of(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--fpa", type=int, default=128)
+    parser.add_argument("--npts", type=int, default=400)
+    parser.add_argument("--tiles", type=int, nargs=2, default=(4, 4))
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as dir_name:
+        dmt = write_mosaic(dir_name, "bench", args.fpa, args.npts, args.tiles, ifg=False)
+        mbytes = args.fpa**2 * args.npts * 4 * args.tiles[0] * args.tiles[1] / 1e6
+        print("Mosaic: {} x {} tiles, FPA {}, {} points ({:.0f} MB)".format(
+            *args.tiles, args.fpa, args.npts, mbytes))
+        for dtype in (np.float32, np.float64):
+            np.testing.assert_array_equal(legacy_assembly(dmt, dtype),
+                                          agilentMosaic(dmt, dtype=dtype).data)
+            t_old = best_of(lambda: legacy_assembly(dmt, dtype), args.repeat)
+            t_new = best_of(lambda: agilentMosaic(dmt, dtype=dtype), args.repeat)
+            print("{:>8}: legacy {:7.1f} MB/s, fused {:7.1f} MB/s ({:.2f}x)".format(
+                np.dtype(dtype).name, mbytes / t_old, mbytes / t_new, t_old / t_new))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+"""
+Benchmark every reader class on a synthetic dataset and emit the results as JSON.
+
+For each reader this measures the header parse time, the open latency (metadata
+only, load_data=False), the full load time and throughput, and the peak memory
+allocated while loading (tracemalloc). Times are the best of --repeat runs.
+
+Usage:
+    python benchmarks/bench_readers.py [--fpa 64] [--npts 200] [--tiles 4 4]
+                                       [--output results.json]
+"""
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+from agilent_format import (agilentImage, agilentImageIFG, agilentMosaic, agilentMosaicIFG,
+                            agilentMosaicTiles, agilentMosaicIFGTiles, agilentHeader)
+from agilent_format.agilent import (__version__, _get_ifg_params, _get_params,
+                                    _get_wavenumbers)
+from agilent_format.synthetic import write_image, write_mosaic
+
+
+def best_of(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t)
+    return min(times)
+
+
+def peak_memory(fn):
+    """Peak bytes allocated (tracemalloc, includes NumPy buffers) while running :fn:"""
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def parse_header(path, ifg):
+    h = agilentHeader.from_path(path)
+    _get_wavenumbers(h)
+    _get_params(h)
+    if ifg:
+        _get_ifg_params(h)
+
+
+def read_tiles(obj):
+    """Load every tile of a tiles object, keeping one at a time"""
+    for (x, y) in np.ndindex(obj.tiles.shape):
+        obj.tiles[x, y]()
+
+
+def readers(dat, dmt):
+    """(name, header file, ifg, open, load) for every reader class"""
+    bsp = dat.with_suffix(".bsp")
+    seq = dat.with_suffix(".seq")
+    return [
+        ("agilentImage", bsp, False,
+         lambda: agilentImage(dat, load_data=False), lambda: agilentImage(dat)),
+        ("agilentImageIFG", bsp, True,
+         lambda: agilentImageIFG(seq, load_data=False), lambda: agilentImageIFG(seq)),
+        ("agilentMosaicTiles", dmt, False,
+         lambda: agilentMosaicTiles(dmt), lambda: read_tiles(agilentMosaicTiles(dmt))),
+        ("agilentMosaic", dmt, False,
+         lambda: agilentMosaic(dmt, load_data=False), lambda: agilentMosaic(dmt)),
+        ("agilentMosaicIFGTiles", dmt, True,
+         lambda: agilentMosaicIFGTiles(dmt), lambda: read_tiles(agilentMosaicIFGTiles(dmt))),
+        ("agilentMosaicIFG", dmt, True,
+         lambda: agilentMosaicIFG(dmt, load_data=False), lambda: agilentMosaicIFG(dmt)),
+    ]
+
+
+def data_bytes(obj):
+    """Bytes of pixel data the reader loads (the tile files without their preamble)"""
+    if hasattr(obj, 'tiles'):
+        n = obj.tiles.size * obj.info['fpasize']**2
+    else:
+        n = obj.info['fpasize']**2
+    return n * obj.info['Npts'] * 4
+
+
+def run(args, directory):
+    dat = write_image(directory, "bench", args.fpa, args.npts)
+    dmt = write_mosaic(directory, "bench", args.fpa, args.npts, args.tiles)
+    results = []
+    for name, header, ifg, open_, load in readers(dat, dmt):
+        nbytes = data_bytes(open_())
+        t_load = best_of(load, args.repeat)
+        results.append({
+            'reader': name,
+            'data_mb': nbytes / 1e6,
+            'header_parse_s': best_of(lambda: parse_header(header, ifg), args.repeat),
+            'open_latency_s': best_of(open_, args.repeat),
+            'load_s': t_load,
+            'throughput_mb_s': nbytes / 1e6 / t_load,
+            'peak_memory_mb': peak_memory(load) / 1e6,
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--fpa", type=int, default=64)
+    parser.add_argument("--npts", type=int, default=200)
+    parser.add_argument("--tiles", type=int, nargs=2, default=(4, 4))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--dir", help="Write the dataset here instead of a temporary directory")
+    parser.add_argument("--output", help="JSON output file (default: stdout)")
+    args = parser.parse_args()
+
+    if args.dir is not None:
+        Path(args.dir).mkdir(parents=True, exist_ok=True)
+        results = run(args, args.dir)
+    else:
+        with tempfile.TemporaryDirectory() as dir_name:
+            results = run(args, dir_name)
+
+    report = {
+        'version': __version__,
+        'python': sys.version.split()[0],
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'time': time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        'params': {'fpa': args.fpa, 'npts': args.npts, 'tiles': list(args.tiles),
+                   'repeat': args.repeat},
+        'results': results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output is None:
+        print(text)
+    else:
+        Path(args.output).write_text(text + "\n")
+
+
+if __name__ == '__main__':
+    main()